@@ -9,11 +9,45 @@ import os
 import sys
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 全局应用名称，供多个函数使用
 APP_NAME = "文件处理工具"
 
+def stat_paths(paths):
+    """
+    并发检查路径是否存在
+
+    网络挂载目录上每次 stat 都是一次往返，并发检查后一次性返回结果
+
+    Returns:
+        {路径: 'dir' / 'file' / None}
+    """
+    def kind(path):
+        if os.path.isdir(path):
+            return 'dir'
+        if os.path.exists(path):
+            return 'file'
+        return None
+
+    paths = list(paths)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return dict(zip(paths, executor.map(kind, paths)))
+
+def copy_file(src, dst):
+    """
+    复制单个文件
+
+    shutil.copyfile 在 Linux 上走 copy_file_range/sendfile 快速路径，
+    再用 copystat 补上 copy2 会保留的时间戳和权限
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
 def get_pyinstaller_command():
     """生成PyInstaller打包命令(Linux版本)"""
 
@@ -45,7 +79,11 @@ def get_pyinstaller_command():
 
     # 包含整个tools目录
     tools_dir = "tools"
-    if os.path.exists(tools_dir):
+
+    # 一次性并发检查所有路径
+    path_kinds = stat_paths([src for src, _ in data_files] + [tools_dir])
+
+    if path_kinds[tools_dir]:
         data_files.append((tools_dir, "tools"))
 
     # 隐藏导入（可能被PyInstaller遗漏的模块）
@@ -86,7 +124,7 @@ def get_pyinstaller_command():
 
     # 添加数据文件
     for src, dst in data_files:
-        if os.path.exists(src):
+        if path_kinds[src]:
             # Linux下使用冒号作为分隔符
             cmd.extend(["--add-data", f"{src}:{dst}"])
 
@@ -156,7 +194,7 @@ def create_flyingbull_package():
     # 复制可执行文件
     exe_path = f"dist/{app_name}"
     if os.path.exists(exe_path):
-        shutil.copy2(exe_path, fb_dir)
+        copy_file(exe_path, fb_dir)
         # 设置执行权限
         os.chmod(os.path.join(fb_dir, app_name), 0o755)
 
@@ -168,13 +206,16 @@ def create_flyingbull_package():
         "tools/下载指南.md"
     ]
 
+    essential_kinds = stat_paths(essential_files)
+
     for file_path in essential_files:
-        if os.path.exists(file_path):
-            if os.path.isdir(file_path):
-                shutil.copytree(file_path, os.path.join(fb_dir, os.path.basename(file_path)))
+        if essential_kinds[file_path]:
+            if essential_kinds[file_path] == 'dir':
+                shutil.copytree(file_path, os.path.join(fb_dir, os.path.basename(file_path)),
+                                copy_function=shutil.copyfile, dirs_exist_ok=True)
             else:
                 os.makedirs(os.path.dirname(os.path.join(fb_dir, file_path)), exist_ok=True)
-                shutil.copy2(file_path, os.path.join(fb_dir, os.path.basename(file_path)))
+                copy_file(file_path, os.path.join(fb_dir, os.path.basename(file_path)))
 
     # 创建启动脚本(Linux shell脚本)
     start_sh_content = f"""
@@ -5,7 +5,10 @@
 """
 
 import os
+import stat
+import threading
 import time
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Callable
 
@@ -13,6 +16,7 @@ from typing import List, Optional, Dict, Any, Callable
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from infrastructure.config import Config
+    from infrastructure.utils import FileManifest
 
 
 @dataclass
@@ -55,12 +59,14 @@ class ProcessingContext:
     source_path: str = ""                     # 原始文件路径
     original_name: str = ""                   # 原始文件名
     is_directory: bool = False                # 是否为目录
+    source_size: int = 0                      # 源文件大小（目录为 0）
 
     # ============ 中间状态 ============
     temp_dir: Optional[str] = None            # 临时目录
     extracted_dir: Optional[str] = None       # 解压后目录
     processed_dir: Optional[str] = None       # 处理后目录
     clean_name: Optional[str] = None          # 清理后的名称
+    manifest: Optional['FileManifest'] = None  # 处理目录的文件清单（扫描一次，多处复用）
 
     # ============ 统计信息 ============
     stats: FileStats = field(default_factory=FileStats)
@@ -91,6 +97,13 @@ class ProcessingContext:
 
     # ============ 回调函数 ============
     status_callback: Optional[Callable[[str], None]] = None
+    publish_turn: Optional[Callable[[], None]] = None  # 发布前调用，阻塞到轮到本文件发布
+
+    # ============ 后台任务 ============
+    background_tasks: Dict[str, Future] = field(default_factory=dict)
+
+    # ============ 取消控制 ============
+    cancel_event: Optional[threading.Event] = None
 
     def update_status(self, message: str):
         """更新状态"""
@@ -105,6 +118,27 @@ class ProcessingContext:
         """添加警告"""
         self.warnings.append(f"[{processor_name}] {warning}")
 
+    def add_background_task(self, processor_name: str, future: Future):
+        """登记与后续处理器并行执行的后台任务"""
+        self.background_tasks[processor_name] = future
+
+    def wait_background_tasks(self) -> bool:
+        """等待所有后台任务结束，失败的任务记为错误；全部成功时返回 True"""
+        ok = True
+        while self.background_tasks:
+            processor_name, future = self.background_tasks.popitem()
+            try:
+                future.result()
+            except Exception as e:
+                self.add_error(processor_name, str(e))
+                ok = False
+        return ok
+
+    @property
+    def is_cancelled(self) -> bool:
+        """是否已被用户取消"""
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
     @property
     def has_errors(self) -> bool:
         """是否有错误"""
@@ -152,7 +186,10 @@ class ProcessingContext:
 
     @classmethod
     def create(cls, source_path: str, config: 'Config' = None,
-               status_callback: Callable[[str], None] = None) -> 'ProcessingContext':
+               status_callback: Callable[[str], None] = None,
+               cancel_event: Optional[threading.Event] = None,
+               source_stat: Optional[os.stat_result] = None,
+               publish_turn: Callable[[], None] = None) -> 'ProcessingContext':
         """
         创建处理上下文的工厂方法
 
@@ -160,16 +197,29 @@ class ProcessingContext:
             source_path: 源文件/目录路径
             config: 配置对象
             status_callback: 状态回调函数
+            cancel_event: 取消事件，置位后管道在下一个处理器之前停止
+            source_stat: 调用方已取得的源路径 stat 结果，提供时不再重复 stat
+            publish_turn: 发布前的等待回调，并行处理多个文件时用来保持发布顺序
 
         Returns:
             ProcessingContext 实例
         """
+        if source_stat is None:
+            try:
+                source_stat = os.stat(source_path)
+            except OSError:
+                source_stat = None
+        is_directory = source_stat is not None and stat.S_ISDIR(source_stat.st_mode)
+
         context = cls(
             source_path=source_path,
             original_name=os.path.basename(source_path),
-            is_directory=os.path.isdir(source_path),
+            is_directory=is_directory,
+            source_size=source_stat.st_size if source_stat is not None and not is_directory else 0,
             config=config,
-            status_callback=status_callback
+            status_callback=status_callback,
+            cancel_event=cancel_event,
+            publish_turn=publish_turn
         )
 
         # 移除扩展名（如果是压缩文件）
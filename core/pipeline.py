@@ -120,6 +120,12 @@ class Pipeline:
         sorted_processors = sorted(self._processors, key=lambda p: p.priority)
 
         for processor in sorted_processors:
+            # 用户取消时不再启动后续处理器（临时目录由调用方兜底清理）
+            if context.is_cancelled:
+                context.add_error(processor.name, "处理已取消")
+                self._emit_event(Events.PIPELINE_ERROR, processor.name, "处理已取消")
+                break
+
             try:
                 # 检查是否可以处理
                 if not processor.can_process(context):
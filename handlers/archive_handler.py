@@ -5,12 +5,33 @@
 """
 
 import os
+import re
 import shutil
 import subprocess
-from typing import List, Optional
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from .tool_locator import ToolLocator
 
+# 多模式匹配支持
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+
+# 进程内读取 7z 压缩包
+try:
+    import py7zr
+    HAS_PY7ZR = True
+except ImportError:
+    HAS_PY7ZR = False
 
 # Windows下隐藏控制台窗口的标志
 if os.name == 'nt':
@@ -19,6 +40,145 @@ else:
     HIDE_WINDOW = 0
 
 
+# 关闭 7z 的标准输出和进度显示，错误信息仍写到 stderr
+QUIET_FLAGS = ('-bso0', '-bsp0')
+
+# 7z l 输出中的文件行：日期 时间 属性 大小 压缩后大小 文件名（定宽列）
+# 属性第一位为 D 的是目录，表头和末尾汇总行的属性列为空，都不会匹配
+_LIST_ROW = re.compile(
+    r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \.[.R][.H][.S][.A] .{12} .{12}  (.+?)\r?$',
+    re.MULTILINE
+)
+
+# 7z 输出中与密码相关的提示 -> 错误类型
+PASSWORD_ERROR_TOKENS = {
+    'wrong password': 'wrong_password',
+    'enter password': 'password_required',
+    'password required': 'password_required',
+    'encrypted archive': 'password_required',
+    '密码错误': 'wrong_password',
+    '需要密码': 'password_required',
+}
+
+
+def _build_password_matcher():
+    """
+    构建密码错误提示的匹配器（模块加载时构建一次）
+
+    有 pyahocorasick 时用 Aho-Corasick 自动机，把常见大小写写法直接放进字典树，
+    匹配时不需要对整段输出做 lower()；否则退化为一个忽略大小写的正则，同样只扫描一遍
+    """
+    if HAS_AHOCORASICK:
+        automaton = ahocorasick.Automaton()
+        for token, tag in PASSWORD_ERROR_TOKENS.items():
+            for variant in {token, token.capitalize(), token.title(), token.upper()}:
+                automaton.add_word(variant, tag)
+        automaton.make_automaton()
+        return automaton
+
+    pattern = '|'.join(re.escape(token) for token in PASSWORD_ERROR_TOKENS)
+    return re.compile(pattern, re.IGNORECASE)
+
+
+_PASSWORD_MATCHER = _build_password_matcher()
+
+# 压缩包信息缓存 {(路径, mtime_ns, 大小): (缓存时间, 信息)}
+_ARCHIVE_INFO_CACHE: Dict[tuple, Tuple[float, Any]] = {}
+_ARCHIVE_INFO_TTL = 30
+_ARCHIVE_INFO_LOCK = threading.Lock()
+
+
+def _archive_cache_key(file_path: str) -> Optional[tuple]:
+    """缓存键，文件被修改后键随之变化"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+
+def invalidate_archive_info(file_path: str):
+    """清除某个压缩包的缓存信息"""
+    path = os.path.abspath(file_path)
+    with _ARCHIVE_INFO_LOCK:
+        for key in [k for k in _ARCHIVE_INFO_CACHE if k[0] == path]:
+            del _ARCHIVE_INFO_CACHE[key]
+
+
+def match_password_error(text: str) -> Optional[str]:
+    """
+    检查 7z 输出是否为密码相关错误
+
+    Returns:
+        'wrong_password' / 'password_required'，不是密码问题返回None
+    """
+    if not text:
+        return None
+
+    if HAS_AHOCORASICK:
+        for _, tag in _PASSWORD_MATCHER.iter(text):
+            return tag
+        return None
+
+    match = _PASSWORD_MATCHER.search(text)
+    return PASSWORD_ERROR_TOKENS[match.group().lower()] if match else None
+
+
+def _iter_files(root: str):
+    """
+    逐个产出目录下的文件条目
+
+    基于 os.scandir，DirEntry 自带类型信息，不拼接路径也不构建列表，调用方可以随时停止
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except OSError:
+            continue
+
+
+class _ProcessRegistry:
+    """并发测试密码时登记正在运行的 7z 进程，找到密码后统一结束"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._closed = False
+
+    def register(self, process: subprocess.Popen) -> bool:
+        """登记进程，已结束时返回False（调用方应自行结束该进程）"""
+        with self._lock:
+            if self._closed:
+                return False
+            self._processes.add(process)
+            return True
+
+    def unregister(self, process: subprocess.Popen):
+        with self._lock:
+            self._processes.discard(process)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def kill_all(self):
+        with self._lock:
+            self._closed = True
+            processes = list(self._processes)
+            self._processes.clear()
+        for process in processes:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
 class ArchiveHandler:
     """
     压缩包处理器
@@ -35,10 +195,14 @@ class ArchiveHandler:
         if not self.seven_zip_path:
             raise RuntimeError("7-Zip未找到")
 
+        # 已确认存在的输出目录，批量打包到同一目录时不再重复 makedirs
+        self._known_dirs = set()
+
     def extract_file(self, file_path: str, dest_dir: str,
                      passwords: List[str] = None,
                      original_name: str = "",
-                     timeout: int = 120) -> bool:
+                     timeout: int = 120,
+                     known_encrypted: bool = False) -> bool:
         """
         解压文件
 
@@ -48,6 +212,7 @@ class ArchiveHandler:
             passwords: 密码列表
             original_name: 原始文件名（用于猜测密码）
             timeout: 超时时间（秒）
+            known_encrypted: 调用方已确认需要密码（如 check_password_required），跳过无密码尝试
 
         Returns:
             是否成功
@@ -57,56 +222,173 @@ class ArchiveHandler:
         # 确保目标目录存在
         os.makedirs(dest_dir, exist_ok=True)
 
-        # 准备密码列表
-        all_passwords = list(passwords or [])
-        if original_name:
-            all_passwords.extend([
-                original_name,
-                os.path.splitext(original_name)[0]
-            ])
-        all_passwords.extend(["", "123"])  # 空密码和常见密码
+        # 准备密码列表（空密码单独先试）
+        all_passwords = self._build_password_candidates(passwords, original_name)
 
         # 先尝试无密码解压
-        if self._try_extract(file_path, dest_dir, "", timeout):
-            return True
+        if not known_encrypted:
+            success, reason = self._try_extract(file_path, dest_dir, "", timeout)
+            if success:
+                return True
+
+            # 报错信息未匹配密码错误关键字时也继续尝试密码：7z 的本地化输出或
+            # 加密文件头的报错可能不含这些关键字，而 7z t 测试密码的开销很小
+            if reason == 'failed':
+                self._log("无密码解压失败，继续尝试已保存的密码", level="warning")
 
-        # 尝试各个密码
-        for password in all_passwords:
-            if self._try_extract(file_path, dest_dir, password, timeout):
+        # 先用 7z t 并发测试密码，只对测试通过的密码做一次完整解压
+        password = self._find_password(file_path, all_passwords, timeout)
+        if password is not None:
+            success, reason = self._try_extract(file_path, dest_dir, password, timeout)
+            if success:
                 self._log(f"密码解压成功")
                 return True
 
         self._log("所有密码尝试均失败", level="error")
         return False
 
-    def _try_extract(self, file_path: str, dest_dir: str, password: str, timeout: int = 120) -> bool:
-        """尝试解压"""
+    @staticmethod
+    def _build_password_candidates(passwords: Optional[List[str]], original_name: str) -> List[str]:
+        """
+        生成候选密码列表
+
+        保持原有顺序去重，去掉空密码（已在第一次尝试中测试过）；
+        无扩展名的文件名与去掉扩展名后相同，也只保留一次
+        """
+        candidates = list(passwords or [])
+        if original_name:
+            candidates.extend([
+                original_name,
+                os.path.splitext(original_name)[0]
+            ])
+        candidates.append("123")  # 常见密码
+
+        return list(dict.fromkeys(p for p in candidates if p))
+
+    def _try_extract(self, file_path: str, dest_dir: str, password: str,
+                     timeout: int = 120) -> Tuple[bool, Optional[str]]:
+        """
+        尝试解压
+
+        Returns:
+            (是否成功, 失败原因)。失败原因为 'wrong_password' / 'password_required' /
+            'failed'（7z 报错但与密码无关），无法判断时为None
+        """
         try:
-            cmd = [self.seven_zip_path, 'x', file_path, f'-o{dest_dir}', '-y']
+            # -aoa 直接覆盖上一次失败尝试留下的文件，无需在每次尝试前清空目标目录
+            cmd = [self.seven_zip_path, 'x', file_path, f'-o{dest_dir}', '-y', '-aoa', *QUIET_FLAGS]
             if password:
                 cmd.append(f'-p{password}')
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                creationflags=HIDE_WINDOW
-            )
+            result = self._run_quiet(cmd, timeout)
 
             if result.returncode == 0:
-                # 检查是否有文件
-                for root, dirs, files in os.walk(dest_dir):
-                    if files:
-                        return True
+                # 检查是否有文件，找到第一个就返回
+                if next(_iter_files(dest_dir), None) is not None:
+                    return True, None
+                return False, None
 
-            return False
+            return False, match_password_error(self._decode_stderr(result.stderr, 4096)) or 'failed'
 
         except subprocess.TimeoutExpired:
+            return False, None
+        except Exception:
+            return False, None
+
+    def _find_password(self, file_path: str, candidates: List[str], timeout: int = 120) -> Optional[str]:
+        """
+        并发测试候选密码
+
+        每个候选密码启动一个 7z t 进程，任一密码测试通过后取消排队中的任务并结束其余进程
+
+        Returns:
+            测试通过的密码，全部失败返回None
+        """
+        if not candidates:
+            return None
+
+        registry = _ProcessRegistry()
+        workers = max(1, min(len(candidates), os.cpu_count() or 1))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        # 循环中不变的属性先绑定到局部变量
+        submit, probe = executor.submit, self._probe_password
+        try:
+            futures = {
+                submit(probe, file_path, password, timeout, registry): password
+                for password in candidates
+            }
+            for future in as_completed(futures):
+                if future.result():
+                    return futures[future]
+            return None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            registry.kill_all()
+
+    def _probe_password(self, file_path: str, password: str, timeout: int = 120,
+                        registry: _ProcessRegistry = None) -> bool:
+        """
+        测试密码是否正确
+
+        7z t 不写出文件，密码错误时在第一个加密块就会报错返回，比完整解压便宜得多
+        """
+        if registry is not None and registry.closed:
             return False
+
+        try:
+            process = subprocess.Popen(
+                [self.seven_zip_path, 't', file_path, f'-p{password}', '-y'],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                creationflags=HIDE_WINDOW
+            )
         except Exception:
             return False
 
+        if registry is not None and not registry.register(process):
+            process.kill()
+            process.wait()
+            return False
+
+        try:
+            return process.wait(timeout=timeout) == 0
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            return False
+        finally:
+            if registry is not None:
+                registry.unregister(process)
+
+    def _ensure_dir(self, directory: str):
+        """确保目录存在"""
+        if not directory or directory in self._known_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._known_dirs.add(directory)
+
+    @staticmethod
+    def _run_quiet(cmd: List[str], timeout: int) -> subprocess.CompletedProcess:
+        """
+        运行 7z，只保留 stderr
+
+        大压缩包的进度和文件列表输出到 stdout 可达数MB，这里直接丢弃，不做缓冲和解码
+        """
+        return subprocess.run(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=timeout,
+            creationflags=HIDE_WINDOW
+        )
+
+    @staticmethod
+    def _decode_stderr(stderr: bytes, limit: int = 500) -> str:
+        """只解码 stderr 末尾一段，错误信息都在最后"""
+        return (stderr or b'')[-limit:].decode('utf-8', errors='replace').strip()
+
     def create_archive(self, source_dir: str, output_file: str,
                        password: str = "",
                        format_type: str = "7z",
@@ -121,7 +403,7 @@ class ArchiveHandler:
             source_dir: 源目录
             output_file: 输出文件路径
             password: 密码
-            format_type: 格式类型 (7z, zip, zst)
+            format_type: 格式类型 (7z, zip, zst, tar.zst)
             compression_level: 压缩级别 (0-9)
             solid_mode: 固实模式
             dictionary_size: 字典大小
@@ -132,6 +414,15 @@ class ArchiveHandler:
         """
         self._log(f"创建压缩包: {os.path.basename(output_file)}")
 
+        # 输出文件会被覆盖，旧的缓存信息作废
+        invalidate_archive_info(output_file)
+
+        # tar.zst：tar 流直接管道给 zstd
+        if format_type.lower() in ('tar.zst', 'tzst'):
+            if password:
+                self._log("tar.zst 格式不支持密码，已忽略密码", level="warning")
+            return self._create_tar_zst_archive(source_dir, output_file, **kwargs)
+
         # zst格式需要特殊处理
         if format_type.lower() == 'zst':
             return self._create_zst_archive(
@@ -153,38 +444,20 @@ class ArchiveHandler:
         """创建标准格式压缩包"""
         try:
             # 确保输出目录存在
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-            cmd = [self.seven_zip_path, 'a', f'-t{format_type}']
-
-            # 根据格式设置参数
-            if format_type.lower() == '7z':
-                cmd.extend([
-                    '-m0=lzma2',
-                    f'-mx={compression_level}',
-                    f'-md={dictionary_size}'
-                ])
-                if solid_mode:
-                    cmd.append('-ms=on')
-            elif format_type.lower() == 'zip':
-                cmd.extend([
-                    '-m0=deflate',
-                    f'-mx={compression_level}'
-                ])
-
-            # 密码
+            self._ensure_dir(os.path.dirname(output_file))
+
+            cmd = [self.seven_zip_path, 'a',
+                   *self._build_cmd_prefix(format_type, compression_level, solid_mode, dictionary_size)]
+
+            # 密码（不放进缓存的参数里）
             if password:
                 cmd.append(f'-p{password}')
 
-            cmd.extend([output_file, f'{source_dir}{os.sep}*'])
+            cmd.extend([*QUIET_FLAGS, output_file, f'{source_dir}{os.sep}*'])
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                creationflags=HIDE_WINDOW
-            )
+            result = self._run_quiet(cmd, 300)
+            if result.returncode != 0:
+                self._log(f"7z 返回错误: {self._decode_stderr(result.stderr)}", level="error")
 
             return (result.returncode == 0 and
                     os.path.exists(output_file) and
@@ -194,55 +467,265 @@ class ArchiveHandler:
             self._log(f"创建压缩包失败: {e}", level="error")
             return False
 
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _build_cmd_prefix(format_type: str, compression_level: int,
+                          solid_mode: bool, dictionary_size: str) -> tuple:
+        """生成压缩参数（同一组设置批量打包时只构建一次）"""
+        prefix = [f'-t{format_type}']
+
+        # 根据格式设置参数
+        if format_type.lower() == '7z' and compression_level == 0:
+            # 仅存储，不压缩（交给外层压缩时使用）
+            prefix.append('-m0=copy')
+        elif format_type.lower() == '7z':
+            prefix.extend([
+                '-m0=lzma2',
+                f'-mx={compression_level}',
+                f'-md={dictionary_size}'
+            ])
+            if solid_mode:
+                prefix.append('-ms=on')
+        elif format_type.lower() == 'zip':
+            prefix.extend([
+                '-m0=deflate',
+                f'-mx={compression_level}'
+            ])
+
+        return tuple(prefix)
+
     def _create_zst_archive(self, source_dir: str, output_file: str,
                             password: str, compression_level: int,
                             solid_mode: bool, dictionary_size: str,
                             zstd_level: int = 19, **kwargs) -> bool:
-        """创建zst格式压缩包（双层压缩）"""
-        try:
-            # 内层7z文件
-            if output_file.lower().endswith('.zst'):
-                inner_7z = output_file[:-4]
-            else:
-                inner_7z = os.path.splitext(output_file)[0] + ".7z"
+        """
+        创建zst格式压缩包（双层压缩）
+
+        7z 只能把 xz/gzip/bzip2/tar 这类流式格式写到 stdout，.7z 容器写完后需要回填文件头，
+        无法用 -so 直接管道给外层 zstd，所以内层仍需落盘。中间文件放在 finally 里清理，
+        任何一步失败都不会残留
+        """
+        # 内层7z文件
+        if output_file.lower().endswith('.zst'):
+            inner_7z = output_file[:-4]
+        else:
+            inner_7z = os.path.splitext(output_file)[0] + ".7z"
 
+        try:
             # 创建内层7z
+            # 无密码时内层只做存储，由外层 zstd 负责压缩，避免 LZMA2 + zstd 两遍编码；
+            # 有密码时加密后的数据无法再被压缩，内层仍需先用 LZMA2 压缩
+            inner_level = compression_level if password else 0
             if not self._create_standard_archive(
                 source_dir, inner_7z, password,
-                "7z", compression_level, solid_mode, dictionary_size
+                "7z", inner_level, solid_mode, dictionary_size
             ):
                 return False
 
-            # 外层zstd压缩
+            return self._compress_zstd_file(inner_7z, output_file, zstd_level, **kwargs)
+
+        except Exception as e:
+            self._log(f"创建zst压缩包失败: {e}", level="error")
+            return False
+
+        finally:
+            # 清理临时文件
+            try:
+                Path(inner_7z).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def _compress_zstd_file(self, input_file: str, output_file: str,
+                            zstd_level: int, **kwargs) -> bool:
+        """用 zstd 压缩单个文件，有独立的 zstd 命令行工具时优先使用（-T0 多线程 + 长距离匹配）"""
+        zstd_path = self.tool_locator.find_zstd()
+        if zstd_path:
+            cmd = self._build_zstd_cmd(zstd_path, zstd_level, input_file, output_file, **kwargs)
+        else:
             cmd = [
                 self.seven_zip_path, 'a', '-tzstd',
                 f'-mx={zstd_level}',
                 '-mmt=on',
-                output_file, inner_7z
+                *QUIET_FLAGS,
+                output_file, input_file
             ]
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                creationflags=HIDE_WINDOW
-            )
+        result = self._run_quiet(cmd, 300)
+        if result.returncode != 0:
+            self._log(f"zstd 返回错误: {self._decode_stderr(result.stderr)}", level="error")
 
-            # 清理临时文件
-            if os.path.exists(inner_7z):
-                os.remove(inner_7z)
+        return (result.returncode == 0 and
+                os.path.exists(output_file) and
+                os.path.getsize(output_file) > 0)
 
-            return (result.returncode == 0 and
+    def _create_tar_zst_archive(self, source_dir: str, output_file: str,
+                                zstd_level: int = 19, size_hint: int = 0,
+                                **kwargs) -> bool:
+        """
+        创建 tar.zst 压缩包
+
+        tar 是流式格式，7z 可以用 -so 直接写到 stdout，管道给 zstd -T0 多线程压缩，
+        全程不落盘中间文件。tar 不支持加密，需要密码时应使用 zst 格式。
+        没有独立的 zstd 工具时先打 tar 包再用 7z -tzstd 压缩
+        """
+        self._ensure_dir(os.path.dirname(output_file))
+
+        zstd_path = self.tool_locator.find_zstd()
+        if not zstd_path:
+            inner_tar = output_file[:-4] if output_file.lower().endswith('.zst') else output_file + '.tar'
+            try:
+                if not self._create_standard_archive(source_dir, inner_tar, "", "tar", 0, False, ""):
+                    return False
+                return self._compress_zstd_file(inner_tar, output_file, zstd_level, **kwargs)
+            finally:
+                try:
+                    Path(inner_tar).unlink(missing_ok=True)
+                except OSError:
+                    pass
+
+        tar_cmd = [self.seven_zip_path, 'a', '-ttar', '-so', *QUIET_FLAGS,
+                   os.path.basename(output_file)[:-4] or 'archive.tar', f'{source_dir}{os.sep}*']
+        zstd_cmd = self._build_zstd_cmd(zstd_path, zstd_level, '-', output_file,
+                                        size_hint=size_hint, **kwargs)
+
+        try:
+            tar_proc = subprocess.Popen(
+                tar_cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                creationflags=HIDE_WINDOW
+            )
+            try:
+                result = subprocess.run(
+                    zstd_cmd,
+                    stdin=tar_proc.stdout,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    timeout=300,
+                    creationflags=HIDE_WINDOW
+                )
+            finally:
+                # 关闭父进程持有的管道端，zstd 提前退出时 7z 能收到 EPIPE 结束
+                tar_proc.stdout.close()
+            _, tar_stderr = tar_proc.communicate(timeout=60)
+
+            if tar_proc.returncode != 0:
+                self._log(f"7z 返回错误: {self._decode_stderr(tar_stderr)}", level="error")
+            if result.returncode != 0:
+                self._log(f"zstd 返回错误: {self._decode_stderr(result.stderr)}", level="error")
+
+            return (tar_proc.returncode == 0 and result.returncode == 0 and
                     os.path.exists(output_file) and
                     os.path.getsize(output_file) > 0)
 
         except Exception as e:
-            self._log(f"创建zst压缩包失败: {e}", level="error")
+            if 'tar_proc' in locals() and tar_proc.poll() is None:
+                tar_proc.kill()
+                tar_proc.wait()
+            self._log(f"创建tar.zst压缩包失败: {e}", level="error")
             return False
 
+    def check_password_required(self, file_path: str) -> bool:
+        """
+        检查压缩包是否需要密码
+
+        使用 7z l -slt 读取技术信息，不解压数据；结果与 get_archive_info 共用缓存
+        """
+        key = _archive_cache_key(file_path)
+        if key is not None:
+            key = key + ('encrypted',)
+            with _ARCHIVE_INFO_LOCK:
+                cached = _ARCHIVE_INFO_CACHE.get(key)
+            if cached and time.monotonic() - cached[0] < _ARCHIVE_INFO_TTL:
+                return cached[1]
+
+        try:
+            # -p 传入空密码，文件头加密时直接报错而不是等待输入
+            result = subprocess.run(
+                [self.seven_zip_path, 'l', '-slt', '-p', file_path],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=30,
+                creationflags=HIDE_WINDOW
+            )
+        except Exception:
+            return False
+
+        encrypted = ('Encrypted = +' in result.stdout or
+                     match_password_error(result.stderr) is not None)
+
+        if key is not None:
+            with _ARCHIVE_INFO_LOCK:
+                _ARCHIVE_INFO_CACHE[key] = (time.monotonic(), encrypted)
+
+        return encrypted
+
+    @staticmethod
+    def _build_zstd_cmd(zstd_path: str, zstd_level: int, input_file: str, output_file: str,
+                        zstd_long_distance: bool = True, zstd_window_log: int = 27,
+                        size_hint: int = 0, **kwargs) -> List[str]:
+        """生成 zstd 命令行（input_file 为 '-' 时从 stdin 读取）"""
+        level = max(1, min(22, zstd_level))
+        cmd = [zstd_path, '-T0', '-q', '-f', f'-{level}']
+        if level > 19:
+            cmd.append('--ultra')
+        if zstd_long_distance:
+            cmd.append(f'--long={zstd_window_log}')
+        if size_hint > 0 and input_file == '-':
+            # 管道输入时 zstd 不知道数据大小，给出提示以便选择合适的参数
+            cmd.append(f'--size-hint={size_hint}')
+        cmd.extend(['-o', output_file, input_file])
+        return cmd
+
     def get_archive_info(self, file_path: str) -> Optional[dict]:
-        """获取压缩包信息"""
+        """获取压缩包信息（同一文件30秒内重复调用直接返回缓存）"""
+        key = _archive_cache_key(file_path)
+        if key is not None:
+            with _ARCHIVE_INFO_LOCK:
+                cached = _ARCHIVE_INFO_CACHE.get(key)
+            if cached and time.monotonic() - cached[0] < _ARCHIVE_INFO_TTL:
+                return cached[1]
+
+        info = self._read_archive_info(file_path)
+
+        if key is not None and info is not None:
+            with _ARCHIVE_INFO_LOCK:
+                _ARCHIVE_INFO_CACHE[key] = (time.monotonic(), info)
+
+        return info
+
+    def _read_archive_info(self, file_path: str) -> Optional[dict]:
+        """
+        读取压缩包信息
+
+        zip 用标准库、7z 用 py7zr（如已安装）在进程内读取文件列表，省去启动 7z 进程；
+        其他格式或读取失败（如文件头加密）时再调用 7z l
+        """
+        files = self._list_in_process(file_path)
+        if files is not None:
+            return {'total_files': len(files), 'files': files}
+
+        return self._read_archive_info_7z(file_path)
+
+    @staticmethod
+    def _list_in_process(file_path: str) -> Optional[List[str]]:
+        """进程内列出压缩包中的文件，不支持时返回None"""
+        ext = os.path.splitext(file_path)[1].lower()
+        try:
+            if ext == '.zip':
+                with zipfile.ZipFile(file_path) as zf:
+                    return [info.filename for info in zf.infolist() if not info.is_dir()]
+            if ext == '.7z' and HAS_PY7ZR:
+                with py7zr.SevenZipFile(file_path, mode='r') as archive:
+                    return [info.filename for info in archive.list() if not info.is_directory]
+        except Exception:
+            pass
+        return None
+
+    def _read_archive_info_7z(self, file_path: str) -> Optional[dict]:
+        """调用 7z l 读取压缩包信息"""
         try:
             cmd = [self.seven_zip_path, 'l', file_path]
             result = subprocess.run(
@@ -254,15 +737,8 @@ class ArchiveHandler:
             )
 
             if result.returncode == 0:
-                # 解析文件列表
-                lines = result.stdout.split('\n')
-                files = []
-                for line in lines:
-                    if line.strip() and not line.startswith('---'):
-                        parts = line.split()
-                        if len(parts) >= 6:
-                            files.append(' '.join(parts[5:]))
-
+                # 解析文件列表，一次正则扫描取出所有文件行的文件名
+                files = _LIST_ROW.findall(result.stdout)
                 return {'total_files': len(files), 'files': files}
 
         except Exception:
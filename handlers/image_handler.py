@@ -4,13 +4,29 @@
 图片处理器 - 处理图片压缩
 """
 
+import functools
+import gc
+import json
 import os
+import re
+import shutil
+import stat
 import subprocess
-from pathlib import Path
-from typing import Tuple, Set
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import FrozenSet, Iterator, List, Optional, Tuple, Set
 
 from .tool_locator import ToolLocator
 
+# Pillow：常见格式在进程内编解码，省去启动 FFmpeg 进程的开销
+try:
+    from PIL import Image
+    # Pillow 9.1 起重采样常量移到 Image.Resampling
+    _LANCZOS = getattr(Image, 'Resampling', Image).LANCZOS
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
 
 # Windows下隐藏控制台窗口的标志
 if os.name == 'nt':
@@ -18,6 +34,23 @@ if os.name == 'nt':
 else:
     HIDE_WINDOW = 0
 
+# 编码时 FFmpeg 只输出错误信息：不打印版本横幅和进度，stderr 只在失败时用于诊断
+FFMPEG_QUIET_ARGS = ('-hide_banner', '-nostdin', '-nostats', '-loglevel', 'error')
+
+# 一个 FFmpeg 进程最多同时编码的图片数，分摊进程启动和编码器初始化开销
+IMAGE_BATCH_SIZE = 16
+
+# 交给 Pillow 处理的输入和输出格式；HEIC、AVIF 等仍由 FFmpeg 处理
+PIL_INPUT_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'})
+PIL_OUTPUT_FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG'}
+
+# 输出格式对应的文件扩展名（未列出的为 .格式名）
+_FORMAT_EXTENSIONS = {'jpg': ('.jpg', '.jpeg'), 'jpeg': ('.jpg', '.jpeg')}
+
+# 没有 ffprobe 时从 FFmpeg 输出中提取分辨率和编码格式
+_RESOLUTION_RE = re.compile(rb'(\d+)x(\d+)')
+_CODEC_RE = re.compile(rb'Video: (\w+)')
+
 
 class ImageHandler:
     """
@@ -27,12 +60,19 @@ class ImageHandler:
     """
 
     # 支持的图片格式
-    SUPPORTED_EXTENSIONS: Set[str] = {
+    SUPPORTED_EXTENSIONS: FrozenSet[str] = frozenset({
         '.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.heic', '.heif', '.webp'
-    }
+    })
 
     # GIF格式（跳过）
-    GIF_EXTENSIONS: Set[str] = {'.gif'}
+    GIF_EXTENSIONS: FrozenSet[str] = frozenset({'.gif'})
+
+    # 所有可识别的图片格式
+    IMAGE_EXTENSIONS: FrozenSet[str] = SUPPORTED_EXTENSIONS | GIF_EXTENSIONS
+
+    # 供 str.endswith 使用的后缀元组
+    _SUPPORTED_SUFFIXES = tuple(sorted(SUPPORTED_EXTENSIONS))
+    _GIF_SUFFIXES = tuple(sorted(GIF_EXTENSIONS))
 
     def __init__(self, tool_locator: ToolLocator = None, logger=None):
         self.tool_locator = tool_locator or ToolLocator()
@@ -50,7 +90,11 @@ class ImageHandler:
                         output_format: str = "webp",
                         lossless: bool = False,
                         timeout: int = 120,
-                        max_size_mb: int = 10) -> Tuple[int, int, int]:
+                        max_size_mb: int = 10,
+                        image_paths: Optional[List[str]] = None,
+                        max_workers: int = 0,
+                        compression_level: int = 6,
+                        encoder_threads: int = 0) -> Tuple[int, int, int]:
         """
         压缩目录中的图片
 
@@ -63,93 +107,231 @@ class ImageHandler:
             lossless: 是否无损压缩
             timeout: 超时时间（秒）
             max_size_mb: 单个图片最大大小（MB），超过会进一步降低质量
+            image_paths: 已知的文件列表（如处理上下文中的文件清单），提供时不再遍历目录
+            max_workers: 同时运行的 FFmpeg 进程数上限，0 表示 CPU 核数
+            compression_level: WebP 压缩等级 (0-6)，越高越慢、文件越小
+            encoder_threads: 每个 FFmpeg 进程的编码线程数，0 表示由 FFmpeg 决定
 
         Returns:
             (成功数量, 失败数量, 超大文件数量)
         """
-        # 收集要处理的文件
-        files_to_process = []
-        skipped_gifs = []
+        # 扫描目录时边遍历边提交：攒满一批就交给线程池，编码与遍历同时进行
+        candidates = self._iter_images(directory) if image_paths is None else image_paths
 
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                ext = Path(file).suffix.lower()
-                file_path = os.path.join(root, file)
+        max_size_bytes = max_size_mb * 1024 * 1024
+        counts = {'success': 0, 'oversized': 0, 'skipped': 0, 'failed': 0}
+
+        # 图片分批，每批由一个 FFmpeg 进程一次编码多张；各批用线程池并发调度
+        workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        # 遍历速度远快于编码，限制已提交未完成的批次数，超过时先等待并汇总结果
+        max_in_flight = workers * 2
+        args = (max_width, max_height, quality, output_format, lossless, timeout, max_size_bytes,
+                compression_level, encoder_threads)
+        total = 0
+        skipped_gifs = 0
+        pending = []
+        futures = {}
+
+        def collect(done):
+            for future in done:
+                batch = futures.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    self._log(f"压缩失败: {e}", level="warning")
+                    counts['failed'] += len(batch)
+                    continue
+
+                for img_path, result in results:
+                    counts[result] += 1
+                    if result == 'oversized':
+                        self._log(f"图片压缩后仍较大: {os.path.basename(img_path)}", level="warning")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for file_path in candidates:
+                name = file_path.lower()
+                if name.endswith(self._GIF_SUFFIXES):
+                    skipped_gifs += 1
+                elif name.endswith(self._SUPPORTED_SUFFIXES):
+                    total += 1
+                    pending.append(file_path)
+                    if len(pending) >= IMAGE_BATCH_SIZE:
+                        futures[executor.submit(self._compress_batch, pending, *args)] = pending
+                        pending = []
+                        if len(futures) >= max_in_flight:
+                            collect(wait(futures, return_when=FIRST_COMPLETED).done)
+
+            if skipped_gifs:
+                self._log(f"跳过 {skipped_gifs} 个GIF文件")
+
+            if not total:
+                self._log("没有找到需要压缩的图片")
+                return 0, 0, 0
+
+            self._log(f"找到 {total} 张图片需要压缩")
+
+            # 剩余不足一批的图片按并发数均分，图片较少时仍能用满所有工作线程
+            if pending:
+                batch_size = -(-len(pending) // workers)
+                for i in range(0, len(pending), batch_size):
+                    batch = pending[i:i + batch_size]
+                    futures[executor.submit(self._compress_batch, batch, *args)] = batch
+
+            collect(as_completed(futures))
+
+        compressed_count = counts['success'] + counts['oversized']
+        failed_count = counts['failed']
+        oversized_count = counts['oversized']
+        if counts['skipped']:
+            self._log(f"跳过 {counts['skipped']} 张已符合要求的图片")
+        self._log(f"图片压缩完成: 成功 {compressed_count}，失败 {failed_count}，超大 {oversized_count}")
+        return compressed_count, failed_count, oversized_count
 
-                if ext in self.GIF_EXTENSIONS:
-                    skipped_gifs.append(file_path)
-                elif ext in self.SUPPORTED_EXTENSIONS:
-                    files_to_process.append(file_path)
+    def _iter_images(self, directory: str) -> Iterator[str]:
+        """
+        用 os.scandir 递归遍历目录，逐个产出待压缩图片和 GIF 的路径
 
-        if skipped_gifs:
-            self._log(f"跳过 {len(skipped_gifs)} 个GIF文件")
+        先按文件名判断后缀，只有命中的条目才取完整路径。每个目录先读完
+        再产出，压缩过程中在该目录新写入的输出文件不会被再次遍历到
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name.lower()
+            try:
+                if name.endswith(self._SUPPORTED_SUFFIXES) or name.endswith(self._GIF_SUFFIXES):
+                    if entry.is_file():
+                        yield entry.path
+                elif entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+            except OSError:
+                continue
+        for subdir in subdirs:
+            yield from self._iter_images(subdir)
+
+    @staticmethod
+    def _output_paths(img_path: str, output_format: str) -> Tuple[str, str]:
+        """
+        计算输出路径
 
-        if not files_to_process:
-            self._log("没有找到需要压缩的图片")
-            return 0, 0, 0
+        Returns:
+            (最终路径, 编码时写入的路径)；输入输出同格式时先写临时文件
+        """
+        new_path = os.path.splitext(img_path)[0] + f'.{output_format}'
+        if img_path.lower() == new_path.lower():
+            return new_path, os.path.splitext(img_path)[0] + f'_temp.{output_format}'
+        return new_path, new_path
+
+    def _compress_batch(self, batch: List[str],
+                        max_width: int, max_height: int,
+                        quality: int, output_format: str,
+                        lossless: bool, timeout: int = 120,
+                        max_size_bytes: int = None,
+                        compression_level: int = 6,
+                        encoder_threads: int = 0) -> List[Tuple[str, str]]:
+        """
+        压缩一批图片
 
-        self._log(f"找到 {len(files_to_process)} 张图片需要压缩")
+        先用一个 FFmpeg 进程编码整批图片，再逐张检查大小、替换原文件；
+        批量编码未产出的图片（如某张图片损坏导致进程退出）回退为单张编码
 
-        max_size_bytes = max_size_mb * 1024 * 1024
-        compressed_count = 0
-        failed_count = 0
-        oversized_count = 0
+        Returns:
+            [(图片路径, 结果)]，结果同 _compress_single_image，已符合要求的图片为 'skipped'
+        """
+        # 已是目标格式且尺寸、大小都在限制内的图片不再重新编码
+        results = []
+        pending = []
+        for img_path in batch:
+            if self._is_compliant(img_path, max_width, max_height, output_format, max_size_bytes):
+                results.append((img_path, 'skipped'))
+            else:
+                pending.append(img_path)
+
+        encoded = set()
+        ffmpeg_items = [img_path for img_path in pending
+                        if not self._can_use_pillow(img_path, output_format)]
+        if len(ffmpeg_items) > 1:
+            encoded = self._do_compress_batch(
+                [(img_path, self._output_paths(img_path, output_format)[1]) for img_path in ffmpeg_items],
+                max_width, max_height, quality, output_format, lossless, timeout * len(ffmpeg_items),
+                compression_level, encoder_threads
+            )
 
-        for img_path in files_to_process:
-            try:
-                result = self._compress_single_image(
-                    img_path, max_width, max_height,
-                    quality, output_format, lossless, timeout, max_size_bytes
-                )
-                if result == 'success':
-                    compressed_count += 1
-                elif result == 'oversized':
-                    compressed_count += 1
-                    oversized_count += 1
-                    self._log(f"图片压缩后仍较大: {os.path.basename(img_path)}", level="warning")
-                else:
-                    failed_count += 1
-            except Exception as e:
-                self._log(f"压缩失败: {os.path.basename(img_path)} - {e}", level="warning")
-                failed_count += 1
+        results.extend(
+            (img_path, self._compress_single_image(
+                img_path, max_width, max_height, quality, output_format,
+                lossless, timeout, max_size_bytes, pre_encoded=img_path in encoded,
+                compression_level=compression_level, encoder_threads=encoder_threads
+            ))
+            for img_path in pending
+        )
+        return results
 
-        self._log(f"图片压缩完成: 成功 {compressed_count}，失败 {failed_count}，超大 {oversized_count}")
-        return compressed_count, failed_count, oversized_count
+    @staticmethod
+    def _is_compliant(img_path: str, max_width: int, max_height: int,
+                      output_format: str, max_size_bytes: Optional[int]) -> bool:
+        """
+        图片是否已符合要求：目标格式、不超过最大尺寸和大小限制
+
+        Pillow 打开图片只读取文件头，不解码像素；没有 Pillow 时一律重新编码
+        """
+        if not HAS_PIL or not max_size_bytes:
+            return False
+        ext = os.path.splitext(img_path)[1].lower()
+        if ext not in _FORMAT_EXTENSIONS.get(output_format, ('.' + output_format,)):
+            return False
+        try:
+            if os.path.getsize(img_path) > max_size_bytes:
+                return False
+            with Image.open(img_path) as img:
+                width, height = img.size
+        except Exception:
+            return False
+        return width <= max_width and height <= max_height
 
     def _compress_single_image(self, img_path: str,
                                 max_width: int, max_height: int,
                                 quality: int, output_format: str,
                                 lossless: bool, timeout: int = 120,
-                                max_size_bytes: int = None) -> str:
+                                max_size_bytes: int = None,
+                                pre_encoded: bool = False,
+                                compression_level: int = 6,
+                                encoder_threads: int = 0) -> str:
         """
         压缩单张图片
 
+        Args:
+            pre_encoded: 已按初始质量批量编码过，首轮直接检查结果
+
         Returns:
             'success' - 成功
             'oversized' - 成功但超过大小限制
             'failed' - 失败
         """
-        # 生成新文件名
-        new_path = os.path.splitext(img_path)[0] + f'.{output_format}'
-
-        # 如果输入输出路径相同（同格式压缩），需要使用临时文件
-        same_format = (img_path.lower() == new_path.lower())
-        if same_format:
-            temp_path = os.path.splitext(img_path)[0] + f'_temp.{output_format}'
-        else:
-            temp_path = new_path
+        new_path, temp_path = self._output_paths(img_path, output_format)
+        same_format = temp_path != new_path
 
         # 尝试压缩，如果超过大小限制则逐步降低质量
         current_quality = quality
         min_quality = 20  # 最低质量
 
-        self._log(f"开始压缩: {os.path.basename(img_path)} -> {os.path.basename(temp_path)}")
+        self._log("开始压缩: %s -> %s", img_path, temp_path, level="debug")
 
         while True:
-            result = self._do_compress(
-                img_path, temp_path, max_width, max_height,
-                current_quality, output_format, lossless, timeout
-            )
+            if pre_encoded:
+                result = True
+                pre_encoded = False
+            else:
+                result = self._do_compress(
+                    img_path, temp_path, max_width, max_height,
+                    current_quality, output_format, lossless, timeout,
+                    compression_level, encoder_threads
+                )
 
             if not result:
                 # 压缩失败
@@ -194,7 +376,7 @@ class ImageHandler:
 
             # 检查最终大小
             final_size = os.path.getsize(new_path)
-            self._log(f"压缩完成: {os.path.basename(new_path)} ({final_size / 1024:.1f}KB)")
+            self._log("压缩完成: %s (%.1fKB)", os.path.basename(new_path), final_size / 1024)
             if max_size_bytes and final_size > max_size_bytes:
                 return 'oversized'
             return 'success'
@@ -220,25 +402,177 @@ class ImageHandler:
     def _do_compress(self, img_path: str, output_path: str,
                      max_width: int, max_height: int,
                      quality: int, output_format: str,
-                     lossless: bool, timeout: int) -> bool:
+                     lossless: bool, timeout: int,
+                     compression_level: int = 6, encoder_threads: int = 0) -> bool:
         """执行实际的压缩操作"""
-        # 构建FFmpeg命令
-        cmd = [
-            self.ffmpeg_path,
-            '-i', img_path,
+        # 常见格式优先用 Pillow 在进程内完成，失败时回退到 FFmpeg
+        if self._can_use_pillow(img_path, output_format):
+            if self._do_compress_pillow(img_path, output_path, max_width, max_height,
+                                        quality, output_format, lossless, compression_level):
+                return True
+
+        # 构建FFmpeg命令（一次构造，编码参数取自缓存）
+        output_args = self._output_args(max_width, max_height, quality, output_format, lossless,
+                                        compression_level, encoder_threads)
+        cmd = (self.ffmpeg_path, *FFMPEG_QUIET_ARGS, '-i', img_path, *output_args, '-y', output_path)
+
+        # 先删除已存在的输出文件：临时目录中的文件可能是源文件的硬链接，
+        # 直接覆盖写入会改动源文件内容
+        try:
+            os.unlink(output_path)
+        except FileNotFoundError:
+            pass
+
+        # 执行命令 - 使用二进制模式避免编码问题
+        self._log("执行FFmpeg: %s 输出: %s", img_path, output_path, level="debug")
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=timeout,
+            creationflags=HIDE_WINDOW
+        )
+
+        if result.returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            self._log("FFmpeg执行成功: %s", output_path, level="debug")
+            return True
+        else:
+            # 打印错误信息
+            error_msg = result.stderr.decode('utf-8', errors='ignore')[:500] if result.stderr else '无错误信息'
+            self._log(f"FFmpeg执行失败 (返回码={result.returncode}): {error_msg}", level="warning")
+            return False
+
+    @staticmethod
+    def _can_use_pillow(img_path: str, output_format: str) -> bool:
+        """该图片能否用 Pillow 压缩"""
+        return (HAS_PIL
+                and output_format in PIL_OUTPUT_FORMATS
+                and os.path.splitext(img_path)[1].lower() in PIL_INPUT_EXTENSIONS)
+
+    def _do_compress_pillow(self, img_path: str, output_path: str,
+                            max_width: int, max_height: int,
+                            quality: int, output_format: str, lossless: bool,
+                            compression_level: int = 6) -> bool:
+        """用 Pillow 缩放并编码（与 FFmpeg 参数对应：只缩小、保持宽高比）"""
+        # 同 _do_compress：避免覆盖写入硬链接的源文件
+        try:
+            os.unlink(output_path)
+        except FileNotFoundError:
+            pass
+
+        pil_format = PIL_OUTPUT_FORMATS[output_format]
+        try:
+            with Image.open(img_path) as img:
+                img.thumbnail((max_width, max_height), _LANCZOS)
+
+                if pil_format == 'JPEG':
+                    if img.mode not in ('RGB', 'L'):
+                        img = img.convert('RGB')
+                    img.save(output_path, pil_format, quality=quality, optimize=True)
+                elif pil_format == 'WEBP':
+                    if img.mode not in ('RGB', 'RGBA'):
+                        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+                    if lossless:
+                        img.save(output_path, pil_format, lossless=True, method=compression_level)
+                    else:
+                        img.save(output_path, pil_format, quality=quality, method=compression_level)
+                else:
+                    img.save(output_path, pil_format, optimize=True)
+        except Exception as e:
+            self._log(f"Pillow压缩失败，改用FFmpeg: {os.path.basename(img_path)} - {e}", level="warning")
+            try:
+                os.unlink(output_path)
+            except OSError:
+                pass
+            return False
+
+        return os.path.getsize(output_path) > 0
+
+    def _do_compress_batch(self, items: List[Tuple[str, str]],
+                           max_width: int, max_height: int,
+                           quality: int, output_format: str,
+                           lossless: bool, timeout: int,
+                           compression_level: int = 6, encoder_threads: int = 0) -> Set[str]:
+        """
+        用一个 FFmpeg 进程编码多张图片（每个输入映射到各自的输出）
+
+        Args:
+            items: [(输入路径, 输出路径)]
+
+        Returns:
+            成功产出输出文件的输入路径集合
+        """
+        cmd = [self.ffmpeg_path, *FFMPEG_QUIET_ARGS]
+        for img_path, _ in items:
+            cmd.extend(['-i', img_path])
+
+        output_args = self._output_args(max_width, max_height, quality, output_format, lossless,
+                                        compression_level, encoder_threads)
+        for index, (_, output_path) in enumerate(items):
+            cmd.extend(['-map', f'{index}:v:0', *output_args, '-y', output_path])
+            # 同 _do_compress：避免覆盖写入硬链接的源文件
+            try:
+                os.unlink(output_path)
+            except FileNotFoundError:
+                pass
+
+        self._log(f"执行FFmpeg批量编码: {len(items)} 张图片")
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=timeout,
+                creationflags=HIDE_WINDOW
+            )
+        except subprocess.TimeoutExpired:
+            self._log("FFmpeg批量编码超时，改为逐张编码", level="warning")
+            return set()
+
+        encoded = set()
+        for img_path, output_path in items:
+            try:
+                if os.path.getsize(output_path) > 0:
+                    encoded.add(img_path)
+            except OSError:
+                continue
+
+        if result.returncode != 0:
+            # 非零退出时输出可能不完整，只信任进程正常结束的结果
+            error_msg = result.stderr.decode('utf-8', errors='ignore')[-500:] if result.stderr else '无错误信息'
+            self._log(f"FFmpeg批量编码失败 (返回码={result.returncode})，改为逐张编码: {error_msg}", level="warning")
+            return set()
+
+        return encoded
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _output_args(max_width: int, max_height: int,
+                     quality: int, output_format: str, lossless: bool,
+                     compression_level: int = 6, encoder_threads: int = 0) -> Tuple[str, ...]:
+        """
+        单个输出的缩放和编码参数
+
+        同一组设置下每张图片的参数都相同，结果按参数缓存
+        """
+        args = [
             '-vf', f"scale='min({max_width},iw)':'min({max_height},ih)':force_original_aspect_ratio=decrease"
         ]
 
+        # 多张图片由多个进程并发编码时，限制单个编码器的线程数避免超额占用 CPU
+        if encoder_threads > 0:
+            args.extend(['-threads', str(encoder_threads)])
+
         # 根据格式添加参数
         if output_format == 'webp':
             if lossless:
-                cmd.extend(['-lossless', '1', '-compression_level', '6'])
+                args.extend(['-lossless', '1', '-compression_level', str(compression_level)])
             else:
-                cmd.extend(['-q:v', str(quality), '-compression_level', '6'])
+                args.extend(['-q:v', str(quality), '-compression_level', str(compression_level)])
 
         elif output_format == 'avif':
             crf = int((100 - quality) * 63 / 100)
-            cmd.extend([
+            args.extend([
                 '-c:v', 'libaom-av1',
                 '-crf', str(crf),
                 '-cpu-used', '8',
@@ -246,43 +580,21 @@ class ImageHandler:
             ])
 
         elif output_format == 'jpg' or output_format == 'jpeg':
-            cmd.extend([
+            args.extend([
                 '-q:v', str(min(31, int((100 - quality) * 31 / 100))),
                 '-huffman', 'optimal'
             ])
 
         elif output_format == 'png':
-            cmd.extend([
+            args.extend([
                 '-pred', 'mixed',
                 '-compression_level', '9'
             ])
 
-        cmd.extend(['-y', output_path])
-
-        # 执行命令 - 使用二进制模式避免编码问题
-        self._log(f"执行FFmpeg: {' '.join(cmd[:5])}... 输出: {os.path.basename(output_path)}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            timeout=timeout,
-            creationflags=HIDE_WINDOW
-        )
-
-        if result.returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-            self._log(f"FFmpeg执行成功: {os.path.basename(output_path)}")
-            return True
-        else:
-            # 打印错误信息
-            error_msg = result.stderr.decode('utf-8', errors='ignore')[:500] if result.stderr else '无错误信息'
-            self._log(f"FFmpeg执行失败 (返回码={result.returncode}): {error_msg}", level="warning")
-            return False
+        return tuple(args)
 
     def _delete_file_with_retry(self, file_path: str, max_retries: int = 5) -> bool:
         """删除文件（带重试机制）"""
-        import time
-        import gc
-        import stat
-
         for i in range(max_retries):
             try:
                 # 强制垃圾回收，释放可能的文件句柄
@@ -292,13 +604,15 @@ class ImageHandler:
                 if not os.path.exists(file_path):
                     return True
 
-                # 尝试修改文件属性为可写
                 try:
+                    os.remove(file_path)
+                except PermissionError:
+                    # 只读文件：修改属性为可写后再删。处理目录中的文件可能是源文件的硬链接，
+                    # chmod 作用于共享的 inode，会改动用户源文件的权限，只对没有其他链接的文件修改
+                    if os.stat(file_path).st_nlink != 1:
+                        raise
                     os.chmod(file_path, stat.S_IWRITE | stat.S_IREAD)
-                except:
-                    pass
-
-                os.remove(file_path)
+                    os.remove(file_path)
                 return True
 
             except PermissionError as e:
@@ -309,7 +623,6 @@ class ImageHandler:
                 else:
                     # 最后一次尝试：使用 shutil 强制删除
                     try:
-                        import shutil
                         shutil.rmtree(file_path, ignore_errors=True)
                         if not os.path.exists(file_path):
                             return True
@@ -328,54 +641,75 @@ class ImageHandler:
         return False
 
     def get_image_info(self, image_path: str) -> dict:
-        """获取图片信息"""
+        """
+        获取图片信息
+
+        优先用 ffprobe 只读取流信息（不解码）并解析 JSON 输出；
+        没有 ffprobe 时回退为解析 FFmpeg 的错误输出
+        """
+        info = {'width': 0, 'height': 0, 'format': '', 'size': 0}
         try:
-            import re
+            info['size'] = os.path.getsize(image_path)
+        except OSError:
+            return info
+
+        try:
+            ffprobe_path = self.tool_locator.find_ffprobe()
+            if ffprobe_path:
+                result = subprocess.run(
+                    [ffprobe_path, '-v', 'error', '-select_streams', 'v:0',
+                     '-show_entries', 'stream=width,height,codec_name',
+                     '-of', 'json', image_path],
+                    capture_output=True,
+                    timeout=10,
+                    creationflags=HIDE_WINDOW
+                )
+                streams = json.loads(result.stdout or b'{}').get('streams') or []
+                if streams:
+                    stream = streams[0]
+                    info['width'] = int(stream.get('width') or 0)
+                    info['height'] = int(stream.get('height') or 0)
+                    info['format'] = stream.get('codec_name') or ''
+                return info
 
-            cmd = [self.ffmpeg_path, '-i', image_path]
             result = subprocess.run(
-                cmd,
+                [self.ffmpeg_path, '-i', image_path],
                 capture_output=True,
-                text=True,
                 timeout=10,
                 creationflags=HIDE_WINDOW
             )
-
-            output = result.stderr
-            info = {
-                'width': 0,
-                'height': 0,
-                'format': '',
-                'size': os.path.getsize(image_path) if os.path.exists(image_path) else 0
-            }
+            output = result.stderr or b''
 
             # 提取分辨率
-            match = re.search(r'(\d+)x(\d+)', output)
+            match = _RESOLUTION_RE.search(output)
             if match:
                 info['width'] = int(match.group(1))
                 info['height'] = int(match.group(2))
 
             # 提取格式
-            match = re.search(r'Video: (\w+)', output)
+            match = _CODEC_RE.search(output)
             if match:
-                info['format'] = match.group(1)
+                info['format'] = match.group(1).decode('ascii', errors='ignore')
 
             return info
 
         except Exception:
-            return {'width': 0, 'height': 0, 'format': '', 'size': 0}
+            return info
 
     def is_image_file(self, file_path: str) -> bool:
         """检查是否为图片文件"""
-        ext = Path(file_path).suffix.lower()
-        return ext in self.SUPPORTED_EXTENSIONS or ext in self.GIF_EXTENSIONS
+        # 只切出最后一个点之后的部分，不拆分整个路径
+        dot = file_path.rfind('.')
+        return dot >= 0 and file_path[dot:].lower() in self.IMAGE_EXTENSIONS
 
-    def _log(self, message: str, level: str = "info"):
-        """记录日志"""
+    def _log(self, message: str, *args, level: str = "info"):
+        """记录日志（args 为 % 风格参数，级别未启用时不格式化）"""
         if self.logger:
             if level == "error":
-                self.logger.error(message)
+                self.logger.error(message, *args)
             elif level == "warning":
-                self.logger.warning(message)
+                self.logger.warning(message, *args)
+            elif level == "debug":
+                self.logger.debug(message, *args)
             else:
-                self.logger.info(message)
\ No newline at end of file
+                self.logger.info(message, *args)
\ No newline at end of file
@@ -4,17 +4,32 @@
 工具定位器 - 查找外部工具路径
 """
 
+import hashlib
+import json
 import os
 import shutil
+import threading
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, Set, Tuple
+
+
+# 工具查找结果缓存：(项目目录, 工具名) -> 路径或 None
+_SEARCH_CACHE: Dict[Tuple[str, str], Optional[str]] = {}
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+# 跨进程的工具路径缓存文件（位于项目目录），只记录找到的路径，
+# 按 PATH 环境变量区分，PATH 变化或缓存的文件不存在时重新查找
+TOOL_CACHE_FILE = "tool_cache.json"
+# 磁盘缓存的读取-合并-保存需串行，避免并发 find_* 互相覆盖条目
+_DISK_CACHE_LOCK = threading.Lock()
 
 
 class ToolLocator:
     """
     工具定位器
 
-    负责查找外部工具（7-Zip、FFmpeg）的路径
+    负责查找外部工具（7-Zip、FFmpeg、zstd）的路径
     """
 
     def __init__(self, project_dir: str = None):
@@ -24,44 +39,154 @@ class ToolLocator:
         # 工具名称
         self._7zip_name = "7z.exe" if os.name == 'nt' else "7z"
         self._ffmpeg_name = "ffmpeg.exe" if os.name == 'nt' else "ffmpeg"
+        self._zstd_name = "zstd.exe" if os.name == 'nt' else "zstd"
+        self._ffprobe_name = "ffprobe.exe" if os.name == 'nt' else "ffprobe"
 
         # 缓存
         self._7zip_path: Optional[str] = None
         self._ffmpeg_path: Optional[str] = None
+        self._zstd_path: Optional[str] = None
+        self._ffprobe_path: Optional[str] = None
 
     def find_7zip(self) -> Optional[str]:
         """查找7-Zip路径"""
         if self._7zip_path:
             return self._7zip_path
 
-        search_paths = self._get_7zip_search_paths()
-
-        for path in search_paths:
-            if os.path.exists(path):
-                self._7zip_path = path
-                return path
-
-        return None
+        self._7zip_path = self._locate('7zip', self._get_7zip_search_paths)
+        return self._7zip_path
 
     def find_ffmpeg(self) -> Optional[str]:
         """查找FFmpeg路径"""
         if self._ffmpeg_path:
             return self._ffmpeg_path
 
-        search_paths = self._get_ffmpeg_search_paths()
+        self._ffmpeg_path = self._locate('ffmpeg', self._get_ffmpeg_search_paths)
+        return self._ffmpeg_path
+
+    def find_zstd(self) -> Optional[str]:
+        """查找zstd命令行工具路径（可选，用于多线程zstd压缩）"""
+        if self._zstd_path:
+            return self._zstd_path
+
+        self._zstd_path = self._locate('zstd', self._get_zstd_search_paths)
+        return self._zstd_path
+
+    def find_ffprobe(self) -> Optional[str]:
+        """查找ffprobe路径（可选，用于读取图片信息，优先与FFmpeg同目录）"""
+        if self._ffprobe_path:
+            return self._ffprobe_path
+
+        self._ffprobe_path = self._locate('ffprobe', self._get_ffprobe_search_paths)
+        return self._ffprobe_path
+
+    def _locate(self, tool: str, get_search_paths) -> Optional[str]:
+        """
+        按搜索路径查找工具
+
+        结果（包括未找到）在进程内按项目目录共享，每次新建 ToolLocator 或每次打包
+        调用 find_* 时不再重复 which 和 stat；需要重新查找时调用 refresh()。
+        候选路径按需产出，项目目录中找到工具时不再执行 PATH 查找
+        """
+        key = (str(self.project_dir), tool)
+        with _SEARCH_CACHE_LOCK:
+            if key in _SEARCH_CACHE:
+                return _SEARCH_CACHE[key]
+
+        # 上次启动时找到的路径仍然存在就直接使用
+        cached = self._load_disk_cache().get(tool)
+        if cached and os.path.isfile(cached):
+            with _SEARCH_CACHE_LOCK:
+                _SEARCH_CACHE[key] = cached
+            return cached
+
+        listings: Dict[str, Set[str]] = {}
+        found = next((path for path in get_search_paths() if self._is_tool_file(path, listings)), None)
+
+        self._remember(tool, found)
+        return found
+
+    def _is_tool_file(self, path: str, listings: Dict[str, Set[str]]) -> bool:
+        """
+        候选路径是否为存在的文件
+
+        项目目录下的候选按所在目录各列一次目录，在内存中比对文件名，名称命中时
+        才 stat 一次；其他位置（PATH、系统安装目录）直接 stat
+        """
+        directory, name = os.path.split(path)
+        project_dir = str(self.project_dir)
+        if directory != project_dir and not directory.startswith(project_dir + os.sep):
+            return os.path.isfile(path)
+
+        entries = listings.get(directory)
+        if entries is None:
+            try:
+                entries = {os.path.normcase(entry) for entry in os.listdir(directory)}
+            except OSError:
+                entries = set()
+            listings[directory] = entries
+        return os.path.normcase(name) in entries and os.path.isfile(path)
+
+    def _remember(self, tool: str, path: Optional[str]):
+        """写入共享查找缓存；找到的路径同时写入磁盘缓存"""
+        with _SEARCH_CACHE_LOCK:
+            _SEARCH_CACHE[(str(self.project_dir), tool)] = path
+        if path:
+            with _DISK_CACHE_LOCK:
+                tools = dict(self._load_disk_cache())
+                if tools.get(tool) != path:
+                    tools[tool] = path
+                    self._save_disk_cache(tools)
+
+    @staticmethod
+    def _path_env_hash() -> str:
+        """PATH 环境变量的摘要"""
+        return hashlib.sha1(os.environ.get('PATH', '').encode('utf-8', 'ignore')).hexdigest()
 
-        for path in search_paths:
-            if os.path.exists(path):
-                self._ffmpeg_path = path
-                return path
+    def _load_disk_cache(self) -> Dict[str, str]:
+        """读取磁盘缓存，PATH 不一致或文件损坏时返回空"""
+        try:
+            with open(self.project_dir / TOOL_CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('path_hash') != self._path_env_hash():
+            return {}
+        tools = data.get('tools')
+        return tools if isinstance(tools, dict) else {}
 
-        return None
+    def _save_disk_cache(self, tools: Dict[str, str]):
+        """保存磁盘缓存（先写临时文件再替换，临时文件名按进程和线程区分）"""
+        cache_file = self.project_dir / TOOL_CACHE_FILE
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'path_hash': self._path_env_hash(), 'tools': tools}, f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    def refresh(self):
+        """清除查找缓存，下次 find_* 时重新搜索"""
+        self._7zip_path = None
+        self._ffmpeg_path = None
+        self._zstd_path = None
+        self._ffprobe_path = None
+        with _SEARCH_CACHE_LOCK:
+            for key in [k for k in _SEARCH_CACHE if k[0] == str(self.project_dir)]:
+                del _SEARCH_CACHE[key]
+        with _DISK_CACHE_LOCK:
+            try:
+                os.remove(self.project_dir / TOOL_CACHE_FILE)
+            except OSError:
+                pass
 
     def find_all(self) -> Dict[str, Optional[str]]:
         """查找所有工具"""
         return {
             '7zip': self.find_7zip(),
-            'ffmpeg': self.find_ffmpeg()
+            'ffmpeg': self.find_ffmpeg(),
+            'zstd': self.find_zstd()
         }
 
     def get_status(self) -> Dict[str, Dict]:
@@ -70,73 +195,104 @@ class ToolLocator:
             '7zip': {
                 'found': self.find_7zip() is not None,
                 'path': self.find_7zip() or "未找到",
-                'suggested_locations': self._get_7zip_search_paths()[:3]
+                'suggested_locations': list(islice(self._get_7zip_search_paths(), 3))
             },
             'ffmpeg': {
                 'found': self.find_ffmpeg() is not None,
                 'path': self.find_ffmpeg() or "未找到",
-                'suggested_locations': self._get_ffmpeg_search_paths()[:3]
+                'suggested_locations': list(islice(self._get_ffmpeg_search_paths(), 3))
+            },
+            'zstd': {
+                'found': self.find_zstd() is not None,
+                'path': self.find_zstd() or "未找到",
+                'suggested_locations': list(islice(self._get_zstd_search_paths(), 3))
             }
         }
 
-    def _get_7zip_search_paths(self) -> List[str]:
-        """获取7-Zip搜索路径"""
-        paths = []
-
+    def _get_7zip_search_paths(self) -> Iterator[str]:
+        """按优先级逐个产出7-Zip候选路径"""
         # 项目目录
-        paths.append(str(self.tools_dir / "7z" / self._7zip_name))
-        paths.append(str(self.tools_dir / self._7zip_name))
-        paths.append(str(self.project_dir / self._7zip_name))
+        yield str(self.tools_dir / "7z" / self._7zip_name)
+        yield str(self.tools_dir / self._7zip_name)
+        yield str(self.project_dir / self._7zip_name)
 
         # 系统 PATH
         system_path = shutil.which(self._7zip_name)
         if system_path:
-            paths.append(system_path)
+            yield system_path
 
         # Windows 安装路径
         if os.name == 'nt':
-            paths.extend([
+            yield from (
                 r"C:\Program Files\7-Zip\7z.exe",
                 r"C:\Program Files (x86)\7-Zip\7z.exe",
-            ])
-
-        return [p for p in paths if p]
-
-    def _get_ffmpeg_search_paths(self) -> List[str]:
-        """获取FFmpeg搜索路径"""
-        paths = []
+            )
 
+    def _get_ffmpeg_search_paths(self) -> Iterator[str]:
+        """按优先级逐个产出FFmpeg候选路径"""
         # 项目目录
-        paths.append(str(self.tools_dir / "ffmpeg" / "bin" / self._ffmpeg_name))
-        paths.append(str(self.tools_dir / "ffmpeg" / self._ffmpeg_name))
-        paths.append(str(self.tools_dir / self._ffmpeg_name))
-        paths.append(str(self.project_dir / self._ffmpeg_name))
+        yield str(self.tools_dir / "ffmpeg" / "bin" / self._ffmpeg_name)
+        yield str(self.tools_dir / "ffmpeg" / self._ffmpeg_name)
+        yield str(self.tools_dir / self._ffmpeg_name)
+        yield str(self.project_dir / self._ffmpeg_name)
 
         # 系统 PATH
         system_path = shutil.which(self._ffmpeg_name)
         if system_path:
-            paths.append(system_path)
+            yield system_path
 
         # Windows 安装路径
         if os.name == 'nt':
-            paths.extend([
+            yield from (
                 r"C:\Program Files\FFmpeg\bin\ffmpeg.exe",
                 r"C:\Program Files (x86)\FFmpeg\bin\ffmpeg.exe",
                 r"C:\ffmpeg\bin\ffmpeg.exe",
-            ])
+            )
+
+    def _get_ffprobe_search_paths(self) -> Iterator[str]:
+        """按优先级逐个产出ffprobe候选路径"""
+        # 与FFmpeg同目录（FFmpeg发行包通常一起提供）
+        ffmpeg_path = self.find_ffmpeg()
+        if ffmpeg_path:
+            yield os.path.join(os.path.dirname(ffmpeg_path), self._ffprobe_name)
+
+        # 系统 PATH
+        system_path = shutil.which(self._ffprobe_name)
+        if system_path:
+            yield system_path
 
-        return [p for p in paths if p]
+    def _get_zstd_search_paths(self) -> Iterator[str]:
+        """按优先级逐个产出zstd候选路径"""
+        # 项目目录
+        yield str(self.tools_dir / "zstd" / self._zstd_name)
+        yield str(self.tools_dir / self._zstd_name)
+        yield str(self.project_dir / self._zstd_name)
+
+        # 系统 PATH
+        system_path = shutil.which(self._zstd_name)
+        if system_path:
+            yield system_path
 
     def set_7zip_path(self, path: str) -> bool:
-        """手动设置7-Zip路径"""
+        """手动设置7-Zip路径（同时写入共享缓存，之后新建的定位器也使用该路径）"""
         if os.path.exists(path):
             self._7zip_path = path
+            self._remember('7zip', path)
             return True
         return False
 
     def set_ffmpeg_path(self, path: str) -> bool:
-        """手动设置FFmpeg路径"""
+        """手动设置FFmpeg路径（同时写入共享缓存，之后新建的定位器也使用该路径）"""
         if os.path.exists(path):
             self._ffmpeg_path = path
+            self._remember('ffmpeg', path)
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def set_zstd_path(self, path: str) -> bool:
+        """手动设置zstd路径（同时写入共享缓存，之后新建的定位器也使用该路径）"""
+        if os.path.exists(path):
+            self._zstd_path = path
+            self._remember('zstd', path)
+            return True
+        return False
@@ -6,9 +6,30 @@
 
 import json
 import os
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields
 from typing import List, Optional
 
+# 快速 JSON 序列化
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _dumps_json(data: dict) -> bytes:
+    """序列化为缩进2格、不转义中文的 JSON"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _loads_json(raw: bytes):
+    """解析 JSON"""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
 
 @dataclass
 class Config:
@@ -33,12 +54,13 @@ class Config:
 
     # ============ 打包配置 ============
     zip_password: str = "cosfan.cc"
-    zip_format: str = "7z"  # 7z, zip, zst
+    zip_format: str = "7z"  # 7z, zip, zst, tar.zst
     zip_compression_level: int = 9
     zip_solid_mode: bool = True
     zip_dictionary_size: str = "32m"
     zip_word_size: int = 64
     zip_block_size: str = "on"
+    background_archiving: bool = False  # 打包与图片压缩、上传并行执行
 
     # ============ zstd配置 ============
     zstd_compression_level: int = 19
@@ -55,6 +77,9 @@ class Config:
     image_format: str = "webp"  # webp, avif, jpg, png
     lossless_compression: bool = False
     max_upload_size_mb: int = 10  # 单个图片最大上传大小（MB），超过则强制压缩
+    compress_workers: int = 0  # 同时运行的 FFmpeg 进程数，0 表示 CPU 核数
+    webp_compression_level: int = 4  # WebP 压缩等级 (0-6)，越高越慢、文件越小
+    encoder_threads: int = 1  # 每个 FFmpeg 进程的编码线程数，0 表示由 FFmpeg 决定
 
     # ============ 上传方式配置 ============
     upload_method: str = "api"  # api, image_host, imgur
@@ -66,6 +91,11 @@ class Config:
     category_api: str = "https://api.cosfan.cc/api/v1/category"
     access_token: str = ""
     upload_batch_size: int = 20
+    upload_concurrency: int = 3  # 同时上传的批次数
+    upload_async: bool = False  # 使用 aiohttp 异步上传（需安装 aiohttp）
+    enable_http2: bool = False  # 使用 HTTP/2 多路复用上传（需安装 httpx[http2]）
+    zero_copy_upload: bool = False  # 使用 sendfile 发送文件内容（Windows 不支持）
+    upload_dedup: bool = True  # 按内容哈希跳过已上传过的图片
 
     # ============ 登录配置 ============
     login_account: str = ""
@@ -84,6 +114,7 @@ class Config:
     delete_compressed_images: bool = True
     enable_upload: bool = True
     enable_publish: bool = True
+    parallel_files: int = 1  # 同时处理的文件数，默认逐个处理；0 表示自动（CPU核数-2，限制在 2~4）
 
     # ============ AI配置 ============
     ai_enabled: bool = False
@@ -102,8 +133,15 @@ class Config:
     imgur_client_id: str = ""  # Imgur Client ID
 
     def to_dict(self) -> dict:
-        """转换为字典"""
-        return asdict(self)
+        """
+        转换为字典
+
+        字段都是基本类型或字符串列表，逐字段浅拷贝即可，不需要 asdict 的递归深拷贝
+        """
+        return {
+            f.name: list(value) if isinstance(value := getattr(self, f.name), list) else value
+            for f in fields(self)
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Config':
@@ -134,30 +172,26 @@ class ConfigManager:
 
     def load_config(self) -> Config:
         """加载配置"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.config = Config.from_dict(data)
-            except Exception as e:
-                print(f"加载配置失败: {e}")
+        try:
+            with open(self.config_file, 'rb') as f:
+                data = _loads_json(f.read())
+            self.config = Config.from_dict(data)
+        except FileNotFoundError:
+            # 首次运行没有配置文件，使用默认配置
+            pass
+        except Exception as e:
+            print(f"加载配置失败: {e}")
         return self.config
 
     def save_config(self) -> bool:
         """保存配置"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config.to_dict(), f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            print(f"保存配置失败: {e}")
-            return False
+        return self.save_config_with_config(self.config)
 
     def save_config_with_config(self, config: Config) -> bool:
         """保存指定的配置对象"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config.to_dict(), f, ensure_ascii=False, indent=2)
+            with open(self.config_file, 'wb') as f:
+                f.write(_dumps_json(config.to_dict()))
             return True
         except Exception as e:
             print(f"保存配置失败: {e}")
@@ -4,14 +4,45 @@
 日志管理模块
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List
 from io import StringIO
 
+# 单个日志文件的大小上限和保留的历史文件数
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """
+    按秒缓存时间字符串的格式化器
+
+    同一秒内的日志复用已格式化好的时间，不必每条都调用 strftime
+    """
+
+    def __init__(self, fmt: str = None, datefmt: str = None):
+        super().__init__(fmt, datefmt)
+        # (秒, 格式化结果)，整体替换，多个线程同时写入也不会读到不一致的值
+        self._time_cache = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        cached_sec, text = self._time_cache
+        if sec != cached_sec:
+            text = time.strftime(self.datefmt or self.default_time_format, self.converter(sec))
+            self._time_cache = (sec, text)
+        if self.datefmt:
+            return text
+        return self.default_msec_format % (text, record.msecs)
+
 
 class Logger:
     """
@@ -49,56 +80,78 @@ class Logger:
         self._memory_handler = StringIO()
         self._memory_logger = logging.StreamHandler(self._memory_handler)
         self._memory_logger.setFormatter(
-            logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s')
+            _CachedTimeFormatter('[%(asctime)s] [%(levelname)s] %(message)s')
         )
         self.logger.addHandler(self._memory_logger)
 
     def _setup_handlers(self):
-        """设置日志处理器"""
-        formatter = logging.Formatter(
+        """
+        设置日志处理器
+
+        文件和控制台输出由后台 QueueListener 线程完成，调用方只把记录放入队列，
+        不在工作线程或界面线程上写磁盘；文件输出再经 MemoryHandler 攒批写入，
+        遇到 ERROR 及以上级别立即刷新
+        """
+        formatter = _CachedTimeFormatter(
             '[%(asctime)s] [%(levelname)s] %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
 
-        # 文件处理器
-        file_handler = logging.FileHandler(
+        # 文件处理器（超过大小上限时轮转）
+        file_handler = logging.handlers.RotatingFileHandler(
             self.log_file,
             encoding='utf-8',
-            mode='a'
+            mode='a',
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUP_COUNT
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        buffered_file_handler = logging.handlers.MemoryHandler(
+            capacity=1024, flushLevel=logging.ERROR, target=file_handler
+        )
+        buffered_file_handler.setLevel(logging.DEBUG)
 
         # 控制台处理器
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
 
-    def info(self, message: str):
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(
+            log_queue, buffered_file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+
+        # 退出时先处理完队列中的记录，再由 logging.shutdown 刷新缓冲的文件输出
+        atexit.register(listener.stop)
+
+    # 以下方法支持 % 风格参数：级别未启用时不做格式化
+
+    def info(self, message: str, *args):
         """记录信息日志"""
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """记录错误日志"""
-        self.logger.error(message)
+        self.logger.error(message, *args)
 
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """记录警告日志"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
 
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """记录调试日志"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
 
-    def critical(self, message: str):
+    def critical(self, message: str, *args):
         """记录严重错误日志"""
-        self.logger.critical(message)
+        self.logger.critical(message, *args)
 
-    def exception(self, message: str):
+    def exception(self, message: str, *args):
         """记录异常日志（包含堆栈信息）"""
-        self.logger.exception(message)
+        self.logger.exception(message, *args)
 
     def get_log_file_path(self) -> str:
         """获取日志文件路径"""
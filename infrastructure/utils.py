@@ -4,18 +4,142 @@
 工具函数模块
 """
 
+import errno
+import functools
+import itertools
 import os
 import re
+import shutil
+import tempfile
 import time
-from pathlib import Path
-from typing import List, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# watchfiles：用系统文件通知（inotify/FSEvents/ReadDirectoryChangesW）等待文件写完
+try:
+    from watchfiles import watch
+    HAS_WATCHFILES = True
+except ImportError:
+    HAS_WATCHFILES = False
+
+# 文件持续多久没有变化视为写入完成（毫秒）
+FILE_STABLE_QUIET_MS = 1000
+
+# 自然排序用的数字分段正则
+_NAT_RE = re.compile(r'([0-9]+)')
+
+# 文件名清理用的正则（模块加载时编译一次）
+_LEADING_NUM_RES = (
+    re.compile(r'^\d+[_\s-]+'),
+    re.compile(r'^No\.\d+[_\s-]+', re.IGNORECASE),
+    re.compile(r'^No_\d+[_\s-]+', re.IGNORECASE),
+)
+_PV_RES = (
+    re.compile(r'\d+P\d*_\d+_\d+_MB'),
+    re.compile(r'\d+P\d*_?\d+_MB'),
+    re.compile(r'\d+P\d*V?'),
+    re.compile(r'P\d+'),
+)
+# 数字+单位（KB/MB/GB/TB/B）合并为一个正则；带下划线的写法按位置规则不同，仍单独处理
+_SIZE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\d+(?:\.\d+)?\s*[KMGT]?B\b',
+    r'_\d+[MGT]?B_?',
+    r'^\d+[MGT]?B\b',
+    r'_\d+_\d+_MB_?',
+))
+# 各种括号一次扫描全部移除
+_BRACKETS_RE = re.compile(r'\[[^\]]*\]|【[^】]*】|「[^」]*」|『[^』]*』')
+_NUM_UNDERSCORE_RES = (
+    re.compile(r'\d+_[A-Za-z0-9\u4e00-\u9fff]+'),
+    re.compile(r'_\d+[a-zA-Z]*$'),
+    re.compile(r'_\d+$'),
+)
+# 连续的特殊符号作为一段整体移除，减少匹配次数
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\u4e00-\u9fff\-\(\)\[\]（）【】「」『』]+')
+_MULTI_SPACE_RE = re.compile(r'\s+')
+_UNDERSCORES_RE = re.compile(r'_+')
+# 任一清理步骤可能起作用的字符：数字、下划线、括号、保留字符以外的符号、
+# 空格以外的空白、连续空白、首尾空白或结尾的 -；都没有时文件名原样返回
+_NEEDS_CLEANING_RE = re.compile(
+    r'[\d_\[\]【】「」『』]|[^\w\s\u4e00-\u9fff\-\(\)（）]|[^\S ]|\s\s|^\s|[-\s]$'
+)
+
+# clean_filename 处理的最大输入长度；文件系统的文件名上限约 255，
+# 更长的输入（如误传入的整段路径或文本）截断后再清理，限制最坏情况下的正则开销
+MAX_CLEAN_INPUT_LENGTH = 512
+
+# 清理后为空的文件名的序号，保证同一秒内生成的 unnamed_ 名称不重复
+_UNNAMED_COUNTER = itertools.count(1)
+
+# 文件大小单位
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# 文件名中不安全字符的替换表
+_UNSAFE_TABLE = str.maketrans({c: '_' for c in '<>:"|?*/\\'})
+
+# 压缩文件扩展名（文件名清理、类型判断和文件选择对话框共用）
+ARCHIVE_EXTENSIONS = frozenset({'.7z', '.zip', '.rar', '.tar', '.gz', '.bz2', '.zst'})
+
+# 供 str.endswith 使用的压缩文件后缀元组
+_ARCHIVE_SUFFIXES = tuple(sorted(ARCHIVE_EXTENSIONS))
+
+# 文件选择对话框使用的压缩文件匹配模式
+ARCHIVE_FILE_PATTERN = " ".join(f"*{ext}" for ext in sorted(ARCHIVE_EXTENSIONS))
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_filename(filename: str) -> str:
+    """
+    FileNameCleaner.clean_filename 的清理步骤，结果可能为空
+
+    重复处理同一文件名（重试、重新扫描）时直接返回缓存结果
+    """
+    # 1. 移除开头的序号
+    for pattern in _LEADING_NUM_RES:
+        filename = pattern.sub('', filename)
+
+    # 2. 删除#标记内容
+    if filename.startswith('#') and '#' in filename[1:]:
+        filename = filename[1:].split('#')[0]
+
+    # 3. 移除P数、V数
+    for pattern in _PV_RES:
+        filename = pattern.sub('', filename)
+
+    # 4. 移除文件大小信息
+    for pattern in _SIZE_RES:
+        filename = pattern.sub('', filename)
+
+    # 5. 移除方括号内容
+    filename = _BRACKETS_RE.sub('', filename)
+
+    # 6. 移除数字和下划线组合
+    for pattern in _NUM_UNDERSCORE_RES:
+        filename = pattern.sub('', filename)
+
+    # 7. 移除特殊符号
+    filename = _SPECIAL_CHARS_RE.sub('', filename)
+
+    # 8. 清理多余空格和符号
+    filename = _MULTI_SPACE_RE.sub(' ', filename)
+    filename = _UNDERSCORES_RE.sub(' ', filename)
+    # 此时空白都已替换为单个空格，去掉首尾空格和结尾的 - 用 str 方法即可
+    filename = filename.rstrip(' -').lstrip(' ')
+
+    # 9. 移除压缩文件扩展名（只转换一次小写；扩展名都只含一个点）
+    if filename.lower().endswith(_ARCHIVE_SUFFIXES):
+        filename = filename[:filename.rfind('.')]
+
+    return filename
 
 
 class FileNameCleaner:
     """文件名清理类"""
 
     # 压缩文件扩展名
-    ARCHIVE_EXTENSIONS = {'.7z', '.zip', '.rar', '.tar', '.gz', '.bz2', '.zst'}
+    ARCHIVE_EXTENSIONS = ARCHIVE_EXTENSIONS
 
     @staticmethod
     def clean_filename(filename: str) -> str:
@@ -28,68 +152,38 @@ class FileNameCleaner:
         Returns:
             清理后的文件名
         """
-        # 1. 移除开头的序号
-        filename = re.sub(r'^\d+[_\s-]+', '', filename)
-        filename = re.sub(r'^No\.\d+[_\s-]+', '', filename, flags=re.IGNORECASE)
-        filename = re.sub(r'^No_\d+[_\s-]+', '', filename, flags=re.IGNORECASE)
-
-        # 2. 删除#标记内容
-        if filename.startswith('#') and '#' in filename[1:]:
-            filename = filename[1:].split('#')[0]
-
-        # 3. 移除P数、V数
-        filename = re.sub(r'\d+P\d*_\d+_\d+_MB', '', filename)
-        filename = re.sub(r'\d+P\d*_?\d+_MB', '', filename)
-        filename = re.sub(r'\d+P\d*V?', '', filename)
-        filename = re.sub(r'P\d+', '', filename)
-
-        # 4. 移除文件大小信息
-        size_patterns = [
-            r'\d+(?:\.\d+)?\s*(?:KB|MB|GB|TB)\b',
-            r'\d+(?:\.\d+)?\s*[MGT]?B\b',
-            r'_\d+[MGT]?B_?',
-            r'^\d+[MGT]?B\b',
-            r'_\d+_\d+_MB_?',
-        ]
-        for pattern in size_patterns:
-            filename = re.sub(pattern, '', filename, flags=re.IGNORECASE)
-
-        # 5. 移除方括号内容
-        bracket_patterns = [
-            r'\[[^\]]*\]',
-            r'【[^】]*】',
-            r'「[^」]*」',
-            r'『[^』]*』',
-        ]
-        for pattern in bracket_patterns:
-            filename = re.sub(pattern, '', filename)
-
-        # 6. 移除数字和下划线组合
-        filename = re.sub(r'\d+_[A-Za-z0-9\u4e00-\u9fff]+', '', filename)
-        filename = re.sub(r'_\d+[a-zA-Z]*$', '', filename)
-        filename = re.sub(r'_\d+$', '', filename)
-
-        # 7. 移除特殊符号
-        filename = re.sub(r'[^\w\s\u4e00-\u9fff\-\(\)\[\]（）【】「」『』]', '', filename)
-
-        # 8. 清理多余空格和符号
-        filename = re.sub(r'\s+', ' ', filename)
-        filename = re.sub(r'_+', ' ', filename)
-        filename = re.sub(r'[-\s]+$', '', filename)
-        filename = filename.strip()
-
-        # 9. 移除压缩文件扩展名
-        for ext in FileNameCleaner.ARCHIVE_EXTENSIONS:
-            if filename.lower().endswith(ext):
-                filename = filename[:-len(ext)]
-                break
-
-        # 确保文件名不为空
+        if len(filename) > MAX_CLEAN_INPUT_LENGTH:
+            filename = filename[:MAX_CLEAN_INPUT_LENGTH]
+
+        # 已经是干净的名称（如上次运行的输出）只做一次扫描即返回，
+        # 也不占用缓存位置，缓存留给需要多轮替换的名称
+        if _NEEDS_CLEANING_RE.search(filename):
+            filename = _clean_filename(filename)
+
+        # 确保文件名不为空（不放进缓存，每次生成新名称；时间戳区分不同运行，序号区分同一秒内的多个）
         if not filename:
-            filename = f"unnamed_{int(time.time())}"
+            filename = f"unnamed_{int(time.time())}_{next(_UNNAMED_COUNTER)}"
 
         return filename
 
+    @staticmethod
+    def clean_many(filenames: Iterable[str]) -> List[str]:
+        """
+        批量清理文件名
+
+        在当前线程依次清理：单个名称的清理只需微秒级，重复名称直接命中缓存，
+        分发到进程池的序列化和进程启动开销（打包后的 Windows 程序还需 freeze_support）
+        远大于收益
+
+        Args:
+            filenames: 原始文件名
+
+        Returns:
+            清理后的文件名，顺序与输入一致
+        """
+        clean = FileNameCleaner.clean_filename
+        return [clean(filename) for filename in filenames]
+
     @staticmethod
     def make_safe_filename(filename: str, max_length: int = 150) -> str:
         """
@@ -102,16 +196,8 @@ class FileNameCleaner:
         Returns:
             安全的文件名
         """
-        # 替换不安全字符
-        unsafe_chars = {
-            '<': '_', '>': '_', ':': '_',
-            '"': '_', '|': '_', '?': '_',
-            '*': '_', '/': '_', '\\': '_'
-        }
-
-        safe_name = filename
-        for char, replacement in unsafe_chars.items():
-            safe_name = safe_name.replace(char, replacement)
+        # 替换不安全字符（一次 translate 完成）
+        safe_name = filename.translate(_UNSAFE_TABLE)
 
         # 限制长度
         if len(safe_name) > max_length:
@@ -120,7 +206,7 @@ class FileNameCleaner:
         return safe_name
 
 
-def is_archive_file(file_path: str) -> bool:
+def is_archive_file(file_path: Union[str, os.PathLike]) -> bool:
     """
     检查是否为压缩文件
 
@@ -130,8 +216,7 @@ def is_archive_file(file_path: str) -> bool:
     Returns:
         是否为压缩文件
     """
-    ext = Path(file_path).suffix.lower()
-    return ext in FileNameCleaner.ARCHIVE_EXTENSIONS
+    return os.fspath(file_path).lower().endswith(_ARCHIVE_SUFFIXES)
 
 
 def get_file_size(file_path: str) -> int:
@@ -163,15 +248,17 @@ def format_file_size(size_bytes: int) -> str:
     if size_bytes == 0:
         return "0 B"
 
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    size = float(size_bytes)
+    # 用二进制位数直接算出单位档位（每 10 位一档，最高 TB），不再循环除以 1024
+    i = min(abs(int(size_bytes)).bit_length() - 1, 49) // 10
+    return f"{size_bytes / (1 << (i * 10)):.1f} {_SIZE_UNITS[i]}"
 
-    while size >= 1024.0 and i < len(size_names) - 1:
-        size /= 1024.0
-        i += 1
 
-    return f"{size:.1f} {size_names[i]}"
+def _safe_stat(file_path: str) -> Optional[os.stat_result]:
+    """stat 文件，不存在或无法访问时返回 None（一次系统调用同时得到是否存在和大小）"""
+    try:
+        return os.stat(file_path)
+    except OSError:
+        return None
 
 
 def wait_for_file_stable(file_path: str, max_wait: int = 60) -> bool:
@@ -188,25 +275,81 @@ def wait_for_file_stable(file_path: str, max_wait: int = 60) -> bool:
     if not os.path.exists(file_path):
         return False
 
-    last_size = get_file_size(file_path)
-    waited = 0
-    check_interval = 2
+    if HAS_WATCHFILES:
+        try:
+            return _wait_for_file_stable_notify(file_path, max_wait)
+        except Exception:
+            pass  # 通知不可用（如网络驱动器）时退回轮询
 
-    while waited < max_wait:
-        time.sleep(check_interval)
-        waited += check_interval
+    return wait_for_files_stable([file_path], max_wait)[file_path]
 
-        if not os.path.exists(file_path):
-            return False
 
-        current_size = get_file_size(file_path)
-        if current_size == last_size and current_size > 0:
-            time.sleep(check_interval)
-            final_size = get_file_size(file_path)
-            return final_size == current_size
+def wait_for_files_stable(file_paths: Iterable[str], max_wait: int = 60,
+                          check_interval: float = 2) -> Dict[str, bool]:
+    """
+    轮询等待多个文件稳定（大小连续两次检查不变且不为空）
+
+    所有文件在同一个循环里检查，每轮只 stat 尚未稳定的文件；
+    同时等待很多文件时不必每个文件各开一个线程、各自 sleep
+
+    Args:
+        file_paths: 文件路径
+        max_wait: 最大等待时间（秒）
+        check_interval: 检查间隔（秒）
 
-        last_size = current_size
+    Returns:
+        {文件路径: 是否稳定}，文件消失或超时为 False
+    """
+    results: Dict[str, bool] = {}
+    # 路径 -> (上次大小, 连续未变化次数)
+    pending: Dict[str, Tuple[int, int]] = {}
+    for path in file_paths:
+        st = _safe_stat(path)
+        if st is None:
+            results[path] = False
+        else:
+            pending[path] = (st.st_size, 0)
+
+    deadline = time.monotonic() + max_wait
+    while pending and time.monotonic() < deadline:
+        time.sleep(check_interval)
+        for path, (last_size, unchanged) in list(pending.items()):
+            st = _safe_stat(path)
+            if st is None:
+                results[path] = False
+                del pending[path]
+                continue
+            size = st.st_size
+
+            unchanged = unchanged + 1 if size == last_size and size > 0 else 0
+            if unchanged >= 2:
+                results[path] = True
+                del pending[path]
+            else:
+                pending[path] = (size, unchanged)
+
+    results.update((path, False) for path in pending)
+    return results
+
+
+def _wait_for_file_stable_notify(file_path: str, max_wait: int) -> bool:
+    """
+    基于文件系统通知等待文件稳定
 
+    阻塞等待文件的变化事件，连续 FILE_STABLE_QUIET_MS 毫秒没有事件即视为写入完成，
+    不再按固定间隔 sleep + stat
+    """
+    deadline = time.monotonic() + max_wait
+    for changes in watch(file_path, watch_filter=None, debounce=200,
+                         rust_timeout=FILE_STABLE_QUIET_MS,
+                         yield_on_timeout=True, raise_interrupt=False):
+        st = _safe_stat(file_path)
+        if st is None:
+            return False
+        if not changes:
+            return st.st_size > 0
+        if time.monotonic() >= deadline:
+            return False
     return False
 
 
@@ -220,12 +363,8 @@ def natural_sort_key(text: str) -> List:
     Returns:
         排序键
     """
-    def tryint(s):
-        try:
-            return int(s)
-        except:
-            return s
-    return [tryint(c) for c in re.split('([0-9]+)', text)]
+    # split 带捕获组时奇数位置一定是 ASCII 数字段；str.isdigit 还接受上标等 int() 无法解析的字符
+    return [int(c) if i & 1 else c for i, c in enumerate(_NAT_RE.split(text))]
 
 
 def ensure_directory(path: str) -> str:
@@ -239,4 +378,313 @@ def ensure_directory(path: str) -> str:
         目录路径
     """
     os.makedirs(path, exist_ok=True)
-    return path
\ No newline at end of file
+    return path
+
+@dataclass
+class FileManifest:
+    """
+    目录文件清单
+
+    以并列列表保存路径、大小和小写扩展名，供多个处理器复用，避免重复遍历目录
+    """
+    paths: List[str] = field(default_factory=list)
+    sizes: List[int] = field(default_factory=list)
+    exts: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def append(self, path: str, size: int, ext: str):
+        """追加一条记录"""
+        self.paths.append(path)
+        self.sizes.append(size)
+        self.exts.append(ext)
+
+    def filter(self, keep: List[bool]) -> 'FileManifest':
+        """按掩码筛选，返回新的清单"""
+        result = FileManifest()
+        for flag, path, size, ext in zip(keep, self.paths, self.sizes, self.exts):
+            if flag:
+                result.append(path, size, ext)
+        return result
+
+    def total_size(self, extensions: Optional[Set[str]] = None) -> int:
+        """统计总大小，可按扩展名过滤"""
+        if extensions is None:
+            return sum(self.sizes)
+        return sum(size for size, ext in zip(self.sizes, self.exts) if ext in extensions)
+
+
+def scan_directory(directory: str) -> FileManifest:
+    """
+    递归扫描目录，生成文件清单
+
+    使用 os.scandir，DirEntry 自带类型信息，每个文件只需一次 stat
+
+    Args:
+        directory: 目录路径
+
+    Returns:
+        文件清单
+    """
+    manifest = FileManifest()
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            size = entry.stat(follow_symlinks=False).st_size
+                            manifest.append(entry.path, size, os.path.splitext(entry.name)[1].lower())
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return manifest
+
+
+def _scan_level(directory: str) -> Tuple[int, List[str]]:
+    """统计目录下一层文件的大小，返回 (大小合计, 子目录列表)"""
+    total = 0
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total, subdirs
+
+
+def get_folder_size(directory: str, max_workers: int = 8) -> int:
+    """
+    统计目录总大小
+
+    用 os.scandir 遍历，文件大小取自 DirEntry.stat，每个文件一次系统调用。
+    顶层没有子目录或 max_workers <= 1 时在当前线程按层遍历；否则每个子目录
+    作为一个任务交给线程池，网络盘或机械盘上的 stat 可以相互重叠
+
+    Args:
+        directory: 目录路径
+        max_workers: 最大线程数
+
+    Returns:
+        目录内所有文件大小之和（字节）
+    """
+    total, subdirs = _scan_level(directory)
+    if not subdirs:
+        return total
+
+    if max_workers <= 1:
+        queue = deque(subdirs)
+        while queue:
+            size, children = _scan_level(queue.popleft())
+            total += size
+            queue.extend(children)
+        return total
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_scan_level, d) for d in subdirs}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                size, children = future.result()
+                total += size
+                pending.update(executor.submit(_scan_level, d) for d in children)
+    return total
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_folder_size(directory: str, mtime_ns: int) -> int:
+    """按 (路径, 修改时间) 缓存的目录大小"""
+    return get_folder_size(directory)
+
+
+def get_folder_size_cached(directory: str) -> int:
+    """
+    统计目录总大小，同一目录重复添加时直接返回缓存结果
+
+    缓存键包含目录的修改时间，目录下增删文件后自动重新统计
+    （只反映顶层目录的变化，深层子目录内的修改不会使缓存失效）
+    """
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return 0
+    return _cached_folder_size(os.path.abspath(directory), mtime_ns)
+
+
+def io_worker_count() -> int:
+    """文件 I/O 线程池的工作线程数"""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+def run_io_tasks(func: Callable, items: Iterable) -> int:
+    """
+    在线程池中并发执行文件 I/O 操作
+
+    Args:
+        func: 对单个条目执行的操作
+        items: 条目列表
+
+    Returns:
+        成功执行的数量（单个失败会被忽略）
+    """
+    items = list(items)
+    if not items:
+        return 0
+
+    def _safe(item) -> bool:
+        try:
+            func(item)
+            return True
+        except OSError:
+            return False
+
+    if len(items) == 1:
+        return int(_safe(items[0]))
+
+    with ThreadPoolExecutor(max_workers=min(io_worker_count(), len(items))) as executor:
+        return sum(executor.map(_safe, items))
+
+
+def copy_file_fast(src: str, dst: str):
+    """
+    复制文件，优先使用 os.copy_file_range
+
+    copy_file_range 在内核中完成复制，btrfs/XFS/NFSv4.2 等支持 reflink 的文件系统上
+    只共享数据块不搬运数据；平台或文件系统不支持时回退为 shutil.copy2
+
+    Args:
+        src: 源文件
+        dst: 目标文件
+    """
+    if not hasattr(os, 'copy_file_range'):
+        shutil.copy2(src, dst)
+        return
+
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL):
+            raise
+        shutil.copy2(src, dst)
+        return
+
+    shutil.copystat(src, dst)
+
+
+def create_process_temp_dir(config=None) -> str:
+    """
+    创建本次处理使用的临时目录
+
+    基础目录依次取 config.temp_dir、output_dir/temp、./temp；
+    目录名由 mkdtemp 原子生成，同一秒内处理多个文件也不会冲突
+
+    Args:
+        config: 配置对象
+
+    Returns:
+        临时目录路径
+    """
+    if config and config.temp_dir:
+        temp_base = config.temp_dir
+    elif config and config.output_dir:
+        temp_base = os.path.join(config.output_dir, "temp")
+    else:
+        temp_base = "temp"
+
+    # 基础目录通常已存在，直接创建；不存在时再补建基础目录
+    try:
+        return tempfile.mkdtemp(prefix="process_", dir=temp_base)
+    except FileNotFoundError:
+        os.makedirs(temp_base, exist_ok=True)
+        return tempfile.mkdtemp(prefix="process_", dir=temp_base)
+
+
+def collect_sorted_files(directory: str, extensions) -> List[str]:
+    """
+    收集目录中指定扩展名的文件，按目录、文件名自然排序
+
+    Args:
+        directory: 目录路径
+        extensions: 扩展名集合（小写，带点）
+
+    Returns:
+        排序后的文件路径列表
+    """
+    extensions = set(extensions)
+    files = []
+    for root, dirs, filenames in os.walk(directory):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in extensions:
+                files.append(os.path.join(root, filename))
+
+    def sort_key(path: str):
+        dirname, filename = os.path.split(path)
+        return [dirname] + natural_sort_key(filename)
+
+    files.sort(key=sort_key)
+    return files
+
+
+def link_or_copy_files(pairs: List[Tuple[str, str]]):
+    """
+    为每对 (源, 目标) 创建硬链接，失败时回退为复制
+
+    硬链接只写目录项，不读写文件内容；跨设备或文件系统不支持硬链接时，
+    剩余文件改为线程池并发 copy_file_fast。目标所在目录需已存在
+
+    Args:
+        pairs: (源文件, 目标文件) 列表
+    """
+    use_link = True
+    to_copy = []
+    for src_file, dst_file in pairs:
+        if use_link:
+            try:
+                os.link(src_file, dst_file)
+                continue
+            except OSError:
+                # EXDEV / EPERM 等：后续文件全部改为复制
+                use_link = False
+        to_copy.append((src_file, dst_file))
+
+    if to_copy:
+        with ThreadPoolExecutor(max_workers=io_worker_count()) as executor:
+            list(executor.map(lambda pair: copy_file_fast(*pair), to_copy))
+
+
+def move_file(src: str, dst: str):
+    """
+    移动文件
+
+    同一文件系统下 os.replace 只改目录项；跨设备时复制后删除源文件
+
+    Args:
+        src: 源文件
+        dst: 目标文件
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        copy_file_fast(src, dst)
+        os.unlink(src)
@@ -4,8 +4,10 @@
 新版入口文件 - 使用模块化架构
 """
 
+import importlib.util
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # 添加当前目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -15,27 +17,26 @@ def check_dependencies():
     """检查依赖项"""
     missing_deps = []
 
-    # 检查Python包
-    try:
-        import requests
-    except ImportError:
-        missing_deps.append("requests")
-
-    try:
-        import tkinterdnd2
-    except ImportError:
-        missing_deps.append("tkinterdnd2")
+    # 检查Python包：只查找模块是否存在，不在启动检查时付出导入开销，
+    # 真正用到时再由各模块导入
+    for package in ("requests", "tkinterdnd2"):
+        if importlib.util.find_spec(package) is None:
+            missing_deps.append(package)
 
-    # 检查外部工具
+    # 检查外部工具：两个工具的目录搜索并行进行
     try:
         from handlers.tool_locator import ToolLocator
         locator = ToolLocator()
 
-        if not locator.find_7zip():
-            missing_deps.append("7-Zip (未找到)")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            has_7zip = executor.submit(locator.find_7zip)
+            has_ffmpeg = executor.submit(locator.find_ffmpeg)
 
-        if not locator.find_ffmpeg():
-            missing_deps.append("FFmpeg (未找到)")
+            if not has_7zip.result():
+                missing_deps.append("7-Zip (未找到)")
+
+            if not has_ffmpeg.result():
+                missing_deps.append("FFmpeg (未找到)")
 
     except Exception as e:
         missing_deps.append(f"工具检测失败: {e}")
@@ -75,27 +76,32 @@ def main():
     from tkinter import messagebox
 
     try:
-        # 检查依赖
-        missing = check_dependencies()
+        # 依赖检查在后台线程进行，与加载配置、导入界面模块同时完成
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            deps_future = executor.submit(check_dependencies)
+
+            # 导入配置
+            from infrastructure.config import ConfigManager
+            from infrastructure.logger import LogManager
+
+            # 加载配置
+            config_manager = ConfigManager()
+            config = config_manager.load_config()
+
+            # 导入GUI
+            from ui.app import Application
+
+            # 检查依赖
+            missing = deps_future.result()
+
         if missing:
             show_dependency_error(missing)
             return
 
-        # 导入配置
-        from infrastructure.config import ConfigManager
-        from infrastructure.logger import LogManager
-
-        # 加载配置
-        config_manager = ConfigManager()
-        config = config_manager.load_config()
-
         # 设置日志
         log_dir = config.log_dir or os.path.join(config.output_dir, "logs") if config.output_dir else "logs"
         logger = LogManager.get_logger(log_dir=log_dir)
 
-        # 导入GUI
-        from ui.app import Application
-
         # 启动应用
         app = Application(config, logger)
         app.run()
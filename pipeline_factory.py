@@ -6,6 +6,9 @@
 创建和配置处理管道
 """
 
+import os
+import shutil
+import threading
 from typing import Optional, Callable
 
 from core.pipeline import Pipeline, PipelineBuilder
@@ -180,6 +183,9 @@ class FileProcessorFacade:
             config, self.logger, self.event_bus
         )
 
+        # 取消事件，由 cancel() 置位，正在处理的文件在下一个处理器之前停止
+        self._cancel_event = threading.Event()
+
         # 设置事件监听
         self._setup_event_listeners()
 
@@ -206,13 +212,17 @@ class FileProcessorFacade:
         """状态更新事件"""
         self.logger.info(message)
 
-    def process(self, file_path: str, status_callback: Callable = None) -> dict:
+    def process(self, file_path: str, status_callback: Callable = None,
+                source_stat: Optional[os.stat_result] = None,
+                publish_turn: Callable[[], None] = None) -> dict:
         """
         处理文件
 
         Args:
             file_path: 文件路径
             status_callback: 状态回调函数
+            source_stat: 已取得的 stat 结果（可选，避免重复 stat）
+            publish_turn: 发布前的等待回调（可选，并行处理时保持发布顺序）
 
         Returns:
             处理结果字典
@@ -223,14 +233,33 @@ class FileProcessorFacade:
         context = ProcessingContext.create(
             source_path=file_path,
             config=self.config,
-            status_callback=status_callback
+            status_callback=status_callback,
+            cancel_event=self._cancel_event,
+            source_stat=source_stat,
+            publish_turn=publish_turn
         )
 
         # 执行管道
         context = self.pipeline.execute(context)
+        self._discard_temp_dir(context)
 
         return context.to_dict()
 
+    def cancel(self):
+        """取消处理：当前文件在下一个处理器之前停止，之后的文件不再处理"""
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @staticmethod
+    def _discard_temp_dir(context):
+        """管道因错误提前结束时清理处理器不会执行，这里兜底删除临时目录"""
+        context.wait_background_tasks()
+        if context.temp_dir and os.path.isdir(context.temp_dir):
+            shutil.rmtree(context.temp_dir, ignore_errors=True)
+
     def process_async(self, file_path: str,
                       callback: Callable[[dict], None] = None,
                       status_callback: Callable[[str], None] = None):
@@ -242,21 +271,11 @@ class FileProcessorFacade:
             callback: 完成回调
             status_callback: 状态回调
         """
-        from core.context import ProcessingContext
-
         def run():
-            context = ProcessingContext.create(
-                source_path=file_path,
-                config=self.config,
-                status_callback=status_callback
-            )
-
-            context = self.pipeline.execute(context)
-
+            result = self.process(file_path, status_callback=status_callback)
             if callback:
-                callback(context.to_dict())
+                callback(result)
 
-        import threading
         thread = threading.Thread(target=run, daemon=True)
         thread.start()
 
@@ -5,7 +5,8 @@
 """
 
 import os
-from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
 
 from core.base import BaseProcessor
 from core.context import ProcessingContext
@@ -26,6 +27,7 @@ class ArchivingProcessor(BaseProcessor):
     def __init__(self, archive_handler: 'ArchiveHandler', event_bus=None):
         super().__init__(event_bus)
         self.archive_handler = archive_handler
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     @property
     def name(self) -> str:
@@ -58,22 +60,82 @@ class ArchivingProcessor(BaseProcessor):
 
         # 根据格式确定扩展名
         zip_format = config.zip_format.lower()
+        if zip_format in ('tar.zst', 'tzst') and config.zip_password:
+            # tar 不支持加密，设置了密码时改用 7z + zstd 双层压缩
+            context.add_warning(self.name, "tar.zst 不支持密码，已改用 zst 格式")
+            zip_format = 'zst'
+
         if zip_format == 'zst':
             extension = ".7z.zst"
+        elif zip_format in ('tar.zst', 'tzst'):
+            extension = ".tar.zst"
         else:
             extension = f".{zip_format}"
 
+        # 输出目录由 ArchiveHandler 按需创建（已确认存在的目录会被缓存）
         output_file = os.path.join(config.output_dir, f"{safe_title}{extension}")
-        os.makedirs(config.output_dir, exist_ok=True)
+
+        # 后台打包：与图片压缩、上传并行，由清理处理器在删除临时目录前等待完成
+        if config.background_archiving and context.temp_dir:
+            source_dir = self._snapshot_processed_dir(context)
+            future = self._get_executor().submit(
+                self._build_archive, context, source_dir, output_file, zip_format
+            )
+            context.add_background_task(self.name, future)
+            self.update_status(context, f"正在后台创建压缩包: {os.path.basename(output_file)}")
+            return context
+
+        self._build_archive(context, context.processed_dir, output_file, zip_format)
+        return context
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """后台打包线程（文件逐个处理，一个线程足够）"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='archiving')
+        return self._executor
+
+    def _snapshot_processed_dir(self, context: ProcessingContext) -> str:
+        """
+        为后台打包准备源目录
+
+        图片压缩会替换处理目录中的文件，启用时先用硬链接做一份快照（只写目录项），
+        打包读取快照，压缩删除原图不影响快照中的数据
+        """
+        if not context.config.enable_compression:
+            return context.processed_dir
+
+        from infrastructure.utils import scan_directory, link_or_copy_files
+        if context.manifest is None:
+            context.manifest = scan_directory(context.processed_dir)
+
+        snapshot_dir = os.path.join(context.temp_dir, "archive_snapshot")
+        os.makedirs(snapshot_dir, exist_ok=True)
+        pairs = []
+        created = {snapshot_dir}
+        for path in context.manifest.paths:
+            target = os.path.join(snapshot_dir, os.path.relpath(path, context.processed_dir))
+            target_parent = os.path.dirname(target)
+            if target_parent not in created:
+                os.makedirs(target_parent, exist_ok=True)
+                created.add(target_parent)
+            pairs.append((path, target))
+
+        link_or_copy_files(pairs)
+        return snapshot_dir
+
+    def _build_archive(self, context: ProcessingContext, source_dir: str,
+                       output_file: str, zip_format: str):
+        """创建压缩包，失败时抛出 CompressionError"""
+        config = context.config
 
         self.update_status(context, f"正在创建压缩包: {os.path.basename(output_file)}")
 
         # 创建压缩包
         success = self.archive_handler.create_archive(
-            source_dir=context.processed_dir,
+            source_dir=source_dir,
             output_file=output_file,
             password=config.zip_password,
-            format_type=config.zip_format,
+            format_type=zip_format,
             compression_level=config.zip_compression_level,
             solid_mode=config.zip_solid_mode,
             dictionary_size=config.zip_dictionary_size,
@@ -81,7 +143,8 @@ class ArchivingProcessor(BaseProcessor):
             zstd_long_distance=config.zstd_long_distance_mode,
             zstd_ldm_distance=config.zstd_ldm_distance,
             zstd_strategy=config.zstd_strategy,
-            zstd_window_log=config.zstd_window_log
+            zstd_window_log=config.zstd_window_log,
+            size_hint=context.manifest.total_size() if context.manifest else 0
         )
 
         if not success:
@@ -89,5 +152,3 @@ class ArchivingProcessor(BaseProcessor):
 
         context.output_archive = output_file
         self.update_status(context, f"压缩包已创建: {os.path.basename(output_file)}")
-
-        return context
\ No newline at end of file
@@ -5,12 +5,14 @@
 """
 
 import os
-from pathlib import Path
-from typing import Set
+from typing import TYPE_CHECKING, Set, Tuple
 
 from core.base import BaseProcessor
 from core.context import ProcessingContext
 
+if TYPE_CHECKING:
+    from infrastructure.utils import FileManifest
+
 
 class CleaningProcessor(BaseProcessor):
     """
@@ -49,13 +51,13 @@ class CleaningProcessor(BaseProcessor):
         # 确定要清理的目录
         target_dir = context.extracted_dir or context.source_path
 
-        if context.is_directory:
-            # 对于目录，先复制到临时目录
-            target_dir = self._copy_to_temp(context)
-
         self.update_status(context, "正在清理不需要的文件...")
 
-        cleaned_count = self._clean_unwanted_files(target_dir)
+        if context.is_directory:
+            # 对于目录，复制到临时目录时直接跳过不需要的文件，一次遍历完成复制、清理和建清单
+            target_dir, cleaned_count = self._copy_to_temp(context)
+        else:
+            cleaned_count = self._clean_unwanted_files(target_dir, context)
 
         context.processed_dir = target_dir
 
@@ -64,60 +66,77 @@ class CleaningProcessor(BaseProcessor):
 
         return context
 
-    def _copy_to_temp(self, context: ProcessingContext) -> str:
-        """将目录复制到临时目录"""
-        import shutil
-        import time
-
-        # 获取临时目录基础路径
-        if context.config and context.config.temp_dir:
-            temp_base = context.config.temp_dir
-        elif context.config and context.config.output_dir:
-            temp_base = os.path.join(context.config.output_dir, "temp")
-        else:
-            temp_base = "temp"
-
-        # 确保基础目录存在
-        os.makedirs(temp_base, exist_ok=True)
-
-        temp_dir = os.path.join(
-            temp_base,
-            f"process_{int(time.time())}_{os.getpid()}"
-        )
-        os.makedirs(temp_dir, exist_ok=True)
+    def _copy_to_temp(self, context: ProcessingContext) -> Tuple[str, int]:
+        """将目录复制到临时目录，返回 (处理目录, 跳过的不需要文件数)"""
+        from infrastructure.utils import create_process_temp_dir
+        temp_dir = create_process_temp_dir(context.config)
         context.temp_dir = temp_dir
 
         # 清理文件名
         from infrastructure.utils import FileNameCleaner
         clean_name = FileNameCleaner.clean_filename(context.original_name)
 
-        # 复制目录
+        # 复制目录（同一文件系统下使用硬链接，不读写文件内容）
         processed_dir = os.path.join(temp_dir, clean_name)
-        shutil.copytree(context.source_path, processed_dir)
+        context.manifest, skipped = self._stage_tree(context.source_path, processed_dir)
 
         context.clean_name = clean_name
-        return processed_dir
-
-    def _clean_unwanted_files(self, directory: str) -> int:
-        """清理不需要的文件"""
-        cleaned_count = 0
-
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-
-                if self._is_unwanted_file(file):
-                    try:
-                        os.remove(file_path)
-                        cleaned_count += 1
-                    except Exception as e:
-                        pass  # 忽略单个文件删除失败
-
+        return processed_dir, skipped
+
+    def _stage_tree(self, src: str, dst: str) -> Tuple['FileManifest', int]:
+        """
+        在临时目录中镜像源目录
+
+        遍历一次源目录：不需要的文件直接跳过，其余文件优先创建硬链接（只写目录项），
+        跨设备或文件系统不支持硬链接时回退为线程池并发复制（copy_file_range，支持时走 reflink）。后续重命名用 os.replace，
+        只作用于链接本身。硬链接与源文件共享 inode，之后的处理不得原地写入文件或修改
+        文件属性（如 chmod），只能删除或替换目录项，否则会改动源目录中的文件。
+
+        Returns:
+            (镜像后的文件清单, 跳过的文件数)
+        """
+        from infrastructure.utils import FileManifest, link_or_copy_files
+
+        manifest = FileManifest()
+        pairs = []
+        skipped = 0
+        stack = [(src, dst)]
+        while stack:
+            src_dir, dst_dir = stack.pop()
+            os.makedirs(dst_dir, exist_ok=True)
+            with os.scandir(src_dir) as it:
+                for entry in it:
+                    target = os.path.join(dst_dir, entry.name)
+                    if entry.is_dir():
+                        stack.append((entry.path, target))
+                    elif self._is_unwanted_file(entry.name):
+                        skipped += 1
+                    else:
+                        pairs.append((entry.path, target))
+                        manifest.append(target, entry.stat().st_size,
+                                        os.path.splitext(entry.name)[1].lower())
+
+        link_or_copy_files(pairs)
+
+        return manifest, skipped
+
+    def _clean_unwanted_files(self, directory: str, context: ProcessingContext) -> int:
+        """清理不需要的文件，并把剩余文件清单保存到上下文供后续处理器复用"""
+        from infrastructure.utils import scan_directory, run_io_tasks
+
+        manifest = scan_directory(directory)
+        keep = [not self._is_unwanted_file(os.path.basename(path)) for path in manifest.paths]
+        unwanted = [path for flag, path in zip(keep, manifest.paths) if not flag]
+
+        # 单个文件删除失败会被忽略
+        cleaned_count = run_io_tasks(os.remove, unwanted)
+
+        context.manifest = manifest.filter(keep)
         return cleaned_count
 
     def _is_unwanted_file(self, filename: str) -> bool:
         """判断是否为不需要的文件"""
-        ext = Path(filename).suffix.lower()
+        ext = os.path.splitext(filename)[1].lower()
         name_lower = filename.lower()
 
         # 检查扩展名
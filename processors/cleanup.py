@@ -6,15 +6,59 @@
 
 import os
 import shutil
-from typing import TYPE_CHECKING
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
 
-from core.base import BaseProcessor
+from core.base import BaseProcessor, StopPipeline
 from core.context import ProcessingContext
 
 if TYPE_CHECKING:
     pass
 
 
+# 保留压缩图片时保存的扩展名
+COMPRESSED_IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.avif'})
+
+# 删除失败的目录（多为 Windows 下文件仍被占用）交给后台重试，
+# 整个批处理共用一个单线程执行器，不会每次失败都新建线程
+_background_pool: Optional[ThreadPoolExecutor] = None
+_background_pool_lock = threading.Lock()
+
+
+def _get_background_pool() -> ThreadPoolExecutor:
+    global _background_pool
+    with _background_pool_lock:
+        if _background_pool is None:
+            _background_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bg_cleanup')
+        return _background_pool
+
+
+def _retry_rmtree(path: str, attempts: int = 3, delay: float = 1.0) -> bool:
+    """间隔递增地重试删除目录"""
+    for i in range(attempts):
+        time.sleep(delay * (i + 1))
+        shutil.rmtree(path, ignore_errors=True)
+        if not os.path.exists(path):
+            return True
+    return False
+
+
+def _move_unshared(src: str, dst: str):
+    """
+    把文件移到保留目录
+
+    仍有其他硬链接的文件（跳过压缩的图片与用户源文件共享 inode）改为复制，
+    保留的文件与源文件互不影响；临时目录中的链接随后随临时目录删除
+    """
+    from infrastructure.utils import copy_file_fast, move_file
+    if os.stat(src).st_nlink > 1:
+        copy_file_fast(src, dst)
+    else:
+        move_file(src, dst)
+
+
 class CleanupProcessor(BaseProcessor):
     """
     清理处理器
@@ -52,6 +96,14 @@ class CleanupProcessor(BaseProcessor):
 
     def process(self, context: ProcessingContext) -> ProcessingContext:
         """执行清理"""
+        # 后台任务（如后台打包）可能仍在读取临时目录；失败时停止管道，
+        # 不删除源文件，临时目录由调用方兜底清理（与同步打包失败一致）
+        if not context.wait_background_tasks():
+            raise StopPipeline("后台任务失败")
+
+        # 保留压缩后的图片（如果配置了），需在删除临时目录之前
+        self._save_compressed_images(context)
+
         # 1. 清理临时目录
         self._cleanup_temp_dir(context)
 
@@ -63,6 +115,45 @@ class CleanupProcessor(BaseProcessor):
 
         return context
 
+    def _save_compressed_images(self, context: ProcessingContext):
+        """
+        将压缩后的图片保存到输出目录的 {标题}_compressed 文件夹
+
+        临时目录随后就会删除，所以直接移动（同一文件系统下只改目录项）而不是复制；
+        与源文件硬链接的图片除外，见 _move_unshared
+        """
+        config = context.config
+        if not config or config.delete_compressed_images or not config.enable_compression:
+            return
+        if not context.processed_dir or not os.path.isdir(context.processed_dir):
+            return
+
+        from infrastructure.utils import FileNameCleaner, scan_directory, run_io_tasks
+
+        if context.manifest is None:
+            context.manifest = scan_directory(context.processed_dir)
+        images = [path for path, ext in zip(context.manifest.paths, context.manifest.exts)
+                  if ext in COMPRESSED_IMAGE_EXTENSIONS]
+        if not images:
+            context.add_warning(self.name, "没有找到可保留的压缩图片")
+            return
+
+        safe_title = FileNameCleaner.make_safe_filename(context.formatted_title or context.clean_name)
+        save_dir = os.path.join(config.output_dir, f"{safe_title}_compressed")
+
+        pairs = []
+        created = set()
+        for path in images:
+            target = os.path.join(save_dir, os.path.relpath(path, context.processed_dir))
+            target_parent = os.path.dirname(target)
+            if target_parent not in created:
+                os.makedirs(target_parent, exist_ok=True)
+                created.add(target_parent)
+            pairs.append((path, target))
+
+        saved = run_io_tasks(lambda pair: _move_unshared(*pair), pairs)
+        self.update_status(context, f"已保留 {saved} 张压缩图片: {save_dir}")
+
     def _cleanup_temp_dir(self, context: ProcessingContext):
         """清理临时目录"""
         if not context.temp_dir:
@@ -70,10 +161,24 @@ class CleanupProcessor(BaseProcessor):
 
         try:
             if os.path.exists(context.temp_dir):
-                shutil.rmtree(context.temp_dir)
+                self._remove_tree(context, context.temp_dir)
                 self.update_status(context, "已清理临时目录")
         except Exception as e:
-            context.add_warning(self.name, f"清理临时目录失败: {e}")
+            _get_background_pool().submit(_retry_rmtree, context.temp_dir)
+            context.add_warning(self.name, f"清理临时目录失败，已转入后台重试: {e}")
+
+    def _remove_tree(self, context: ProcessingContext, path: str):
+        """
+        删除目录树
+
+        文件清单中位于该目录下的文件先用线程池并发 unlink（在 SSD/网络盘上可以并行），
+        剩下的目录和清单外的文件再交给 rmtree
+        """
+        if context.manifest:
+            from infrastructure.utils import run_io_tasks
+            prefix = os.path.join(path, '')
+            run_io_tasks(os.unlink, [p for p in context.manifest.paths if p.startswith(prefix)])
+        shutil.rmtree(path)
 
     def _cleanup_source_file(self, context: ProcessingContext):
         """清理源文件"""
@@ -84,12 +189,15 @@ class CleanupProcessor(BaseProcessor):
             return
 
         try:
-            if os.path.isfile(context.source_path):
-                os.remove(context.source_path)
-                self.update_status(context, f"已删除源文件: {os.path.basename(context.source_path)}")
-            elif os.path.isdir(context.source_path):
+            # 类型在创建上下文时已确定，不再重复 stat
+            if context.is_directory:
                 shutil.rmtree(context.source_path)
                 self.update_status(context, f"已删除源目录: {os.path.basename(context.source_path)}")
+            else:
+                os.remove(context.source_path)
+                self.update_status(context, f"已删除源文件: {os.path.basename(context.source_path)}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             context.add_warning(self.name, f"删除源文件失败: {e}")
 
@@ -105,7 +213,7 @@ class CleanupProcessor(BaseProcessor):
         # 清理解压后的目录
         if context.extracted_dir and os.path.exists(context.extracted_dir):
             try:
-                shutil.rmtree(context.extracted_dir)
+                self._remove_tree(context, context.extracted_dir)
                 self.update_status(context, "已清理解压目录")
             except Exception as e:
                 context.add_warning(self.name, f"清理解压目录失败: {e}")
@@ -113,7 +221,7 @@ class CleanupProcessor(BaseProcessor):
         # 清理处理后的目录
         if context.processed_dir and os.path.exists(context.processed_dir):
             try:
-                shutil.rmtree(context.processed_dir)
+                self._remove_tree(context, context.processed_dir)
                 self.update_status(context, "已清理处理目录")
             except Exception as e:
                 context.add_warning(self.name, f"清理处理目录失败: {e}")
\ No newline at end of file
@@ -4,7 +4,6 @@
 图片压缩处理器 - 压缩图片
 """
 
-import os
 from typing import TYPE_CHECKING
 
 from core.base import BaseProcessor
@@ -13,6 +12,9 @@ from core.context import ProcessingContext
 if TYPE_CHECKING:
     from handlers.image_handler import ImageHandler
 
+# 统计大小时计入的图片扩展名
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.gif'})
+
 
 class ImageCompressionProcessor(BaseProcessor):
     """
@@ -80,6 +82,9 @@ class ImageCompressionProcessor(BaseProcessor):
         lossless = config.lossless_compression if config else False
         timeout = config.api_timeout if config else 120
         max_upload_size_mb = config.max_upload_size_mb if config else 10
+        max_workers = config.compress_workers if config else 0
+        compression_level = config.webp_compression_level if config else 4
+        encoder_threads = config.encoder_threads if config else 1
 
         # 如果上传方式为 imgur，强制使用 jpg 格式
         upload_method = config.upload_method if config else "api"
@@ -89,7 +94,7 @@ class ImageCompressionProcessor(BaseProcessor):
                 output_format = "jpg"
 
         # 检查并记录压缩前的大小
-        total_size_before = self._calculate_total_size(context.processed_dir)
+        total_size_before = self._calculate_total_size(context)
         self.update_status(context, f"压缩前总大小: {total_size_before / (1024*1024):.2f} MB")
 
         # 执行压缩
@@ -101,11 +106,17 @@ class ImageCompressionProcessor(BaseProcessor):
             output_format=output_format,
             lossless=lossless,
             timeout=timeout,
-            max_size_mb=max_upload_size_mb
+            max_size_mb=max_upload_size_mb,
+            max_workers=max_workers,
+            compression_level=compression_level,
+            encoder_threads=encoder_threads,
+            image_paths=list(context.manifest.paths) if context.manifest else None
         )
 
         # 检查压缩后的大小
-        total_size_after = self._calculate_total_size(context.processed_dir)
+        # 压缩会替换文件，需要重新扫描并刷新清单
+        context.manifest = None
+        total_size_after = self._calculate_total_size(context)
         saved_mb = (total_size_before - total_size_after) / (1024*1024)
 
         if compressed > 0:
@@ -117,17 +128,9 @@ class ImageCompressionProcessor(BaseProcessor):
 
         return context
 
-    def _calculate_total_size(self, directory: str) -> int:
+    def _calculate_total_size(self, context: ProcessingContext) -> int:
         """计算目录中所有图片的总大小"""
-        total_size = 0
-        image_extensions = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.gif'}
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in image_extensions:
-                    file_path = os.path.join(root, file)
-                    try:
-                        total_size += os.path.getsize(file_path)
-                    except Exception:
-                        pass
-        return total_size
\ No newline at end of file
+        if context.manifest is None:
+            from infrastructure.utils import scan_directory
+            context.manifest = scan_directory(context.processed_dir)
+        return context.manifest.total_size(IMAGE_EXTENSIONS)
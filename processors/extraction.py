@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING
 from core.base import BaseProcessor
 from core.context import ProcessingContext
 from infrastructure.exceptions import ExtractionError
+from infrastructure.utils import format_file_size
 
 if TYPE_CHECKING:
     from handlers.archive_handler import ArchiveHandler
@@ -50,7 +51,10 @@ class ExtractionProcessor(BaseProcessor):
 
     def process(self, context: ProcessingContext) -> ProcessingContext:
         """执行解压处理"""
-        self.update_status(context, f"正在解压: {os.path.basename(context.source_path)}")
+        self.update_status(
+            context,
+            f"正在解压: {os.path.basename(context.source_path)} ({format_file_size(context.source_size)})"
+        )
 
         # 创建临时目录
         context.temp_dir = self._create_temp_dir(context)
@@ -62,13 +66,17 @@ class ExtractionProcessor(BaseProcessor):
         passwords = config.passwords if config else []
         timeout = config.extraction_timeout if config else 60
 
+        # 先读取压缩包头信息判断是否加密（不解压数据）；加密时跳过必然失败的无密码解压
+        known_encrypted = self.archive_handler.check_password_required(context.source_path)
+
         # 解压文件
         success = self.archive_handler.extract_file(
             file_path=context.source_path,
             dest_dir=extract_dir,
             passwords=passwords,
             original_name=context.original_name,
-            timeout=timeout
+            timeout=timeout,
+            known_encrypted=known_encrypted
         )
 
         if not success:
@@ -83,21 +91,5 @@ class ExtractionProcessor(BaseProcessor):
 
     def _create_temp_dir(self, context: ProcessingContext) -> str:
         """创建临时目录"""
-        import time
-        # 获取临时目录基础路径
-        if context.config and context.config.temp_dir:
-            temp_base = context.config.temp_dir
-        elif context.config and context.config.output_dir:
-            temp_base = os.path.join(context.config.output_dir, "temp")
-        else:
-            temp_base = "temp"
-
-        # 确保基础目录存在
-        os.makedirs(temp_base, exist_ok=True)
-
-        temp_dir = os.path.join(
-            temp_base,
-            f"process_{int(time.time())}_{os.getpid()}"
-        )
-        os.makedirs(temp_dir, exist_ok=True)
-        return temp_dir
\ No newline at end of file
+        from infrastructure.utils import create_process_temp_dir
+        return create_process_temp_dir(context.config)
\ No newline at end of file
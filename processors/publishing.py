@@ -6,7 +6,7 @@
 
 from typing import TYPE_CHECKING, List, Dict
 
-from core.base import BaseProcessor
+from core.base import BaseProcessor, StopPipeline
 from core.context import ProcessingContext
 from infrastructure.exceptions import PublishError
 
@@ -62,6 +62,14 @@ class PublishingProcessor(BaseProcessor):
         if not context.formatted_title:
             raise PublishError("没有格式化标题")
 
+        # 后台打包失败时与同步打包失败一样停止管道，不发布、不删除源文件
+        if not context.wait_background_tasks():
+            raise StopPipeline("后台任务失败")
+
+        # 并行处理多个文件时按队列顺序发布
+        if context.publish_turn:
+            context.publish_turn()
+
         self.update_status(context, "正在发布文章...")
 
         # 发布文章
@@ -6,13 +6,14 @@
 
 import os
 import re
-import shutil
-from pathlib import Path
-from typing import List, Set
+from typing import List, Set, Tuple
 
 from core.base import BaseProcessor
 from core.context import ProcessingContext
 
+# 自然排序用的数字分段正则
+_NAT_RE = re.compile(r'([0-9]+)')
+
 
 class RenamingProcessor(BaseProcessor):
     """
@@ -60,19 +61,23 @@ class RenamingProcessor(BaseProcessor):
             image_prefix = context.config.image_prefix or "img_"
             video_prefix = context.config.video_prefix or "video_"
 
-        # 收集所有文件
-        all_files = self._collect_files(context.processed_dir)
+        # 收集所有文件（优先复用清理阶段生成的文件清单）
+        from infrastructure.utils import scan_directory
+        if context.manifest is None:
+            context.manifest = scan_directory(context.processed_dir)
+        manifest = context.manifest
 
         # 按自然排序
-        all_files.sort(key=self._natural_sort_key)
+        order = sorted(range(len(manifest)), key=lambda i: self._natural_sort_key(manifest.paths[i]))
 
-        # 重命名
+        # 生成重命名计划
         img_count = 1
         video_count = 1
-        renamed_count = 0
+        plan = []
 
-        for file_path in all_files:
-            ext = Path(file_path).suffix.lower()
+        for index in order:
+            file_path = manifest.paths[index]
+            ext = manifest.exts[index]
 
             if ext in self.IMAGE_EXTENSIONS:
                 new_name = f"{image_prefix}{img_count:03d}{ext}"
@@ -83,32 +88,47 @@ class RenamingProcessor(BaseProcessor):
             else:
                 continue
 
-            # 执行重命名
             new_path = os.path.join(os.path.dirname(file_path), new_name)
             if file_path != new_path:
-                try:
-                    shutil.move(file_path, new_path)
-                    renamed_count += 1
-                except Exception:
-                    pass  # 忽略单个文件重命名失败
+                plan.append((index, file_path, new_path))
+
+        renamed_count = self._execute_renames(plan, manifest)
 
         self.update_status(context, f"已重命名 {renamed_count} 个文件")
 
         return context
 
-    def _collect_files(self, directory: str) -> List[str]:
-        """收集所有文件"""
-        files = []
-        for root, dirs, filenames in os.walk(directory):
-            for filename in filenames:
-                files.append(os.path.join(root, filename))
-        return files
+    def _execute_renames(self, plan: List[Tuple[int, str, str]], manifest) -> int:
+        """
+        执行重命名计划
+
+        源和目标在同一目录，直接用 os.replace（单次系统调用）。
+        目标名已被计划内的其他文件占用时（如重复处理已重命名过的目录），
+        先统一改为临时名再改为目标名，避免覆盖尚未改名的文件
+        """
+        existing = set(manifest.paths)
+        if any(new_path in existing for _, _, new_path in plan):
+            staged = []
+            for index, file_path, new_path in plan:
+                temp_path = f"{file_path}.renaming"
+                try:
+                    os.replace(file_path, temp_path)
+                    staged.append((index, temp_path, new_path))
+                except OSError:
+                    pass  # 忽略单个文件重命名失败
+            plan = staged
+
+        renamed_count = 0
+        for index, file_path, new_path in plan:
+            try:
+                os.replace(file_path, new_path)
+                manifest.paths[index] = new_path
+                renamed_count += 1
+            except OSError:
+                pass  # 忽略单个文件重命名失败
+        return renamed_count
 
     def _natural_sort_key(self, text: str) -> List:
         """自然排序键"""
-        def tryint(s):
-            try:
-                return int(s)
-            except:
-                return s
-        return [tryint(c) for c in re.split('([0-9]+)', text)]
\ No newline at end of file
+        # split 带捕获组时奇数位置一定是 ASCII 数字段；str.isdigit 还接受上标等 int() 无法解析的字符
+        return [int(c) if i & 1 else c for i, c in enumerate(_NAT_RE.split(text))]
\ No newline at end of file
@@ -4,9 +4,7 @@
 标题格式化处理器 - 格式化标题并生成标签
 """
 
-import os
 import re
-from pathlib import Path
 from typing import TYPE_CHECKING
 
 from core.base import BaseProcessor
@@ -14,6 +12,11 @@ from core.context import ProcessingContext, FileStats, AIResult
 
 if TYPE_CHECKING:
     from services.ai_service import AIService
+    from infrastructure.utils import FileManifest
+
+# 统计用的扩展名
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff'})
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.3gp', '.m4v'})
 
 
 class TitleFormattingProcessor(BaseProcessor):
@@ -46,8 +49,11 @@ class TitleFormattingProcessor(BaseProcessor):
 
         self.update_status(context, "正在统计文件信息...")
 
-        # 统计文件信息
-        context.stats = self._calculate_stats(context.processed_dir)
+        # 统计文件信息（优先复用文件清单，无需再次遍历目录）
+        if context.manifest is None:
+            from infrastructure.utils import scan_directory
+            context.manifest = scan_directory(context.processed_dir)
+        context.stats = self._calculate_stats(context.manifest)
 
         # 获取基础标题
         from infrastructure.utils import FileNameCleaner
@@ -97,25 +103,16 @@ class TitleFormattingProcessor(BaseProcessor):
 
         return context
 
-    def _calculate_stats(self, directory: str) -> FileStats:
-        """计算文件统计信息"""
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff'}
-        video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.3gp', '.m4v'}
-
+    def _calculate_stats(self, manifest: 'FileManifest') -> FileStats:
+        """根据文件清单计算统计信息"""
         stats = FileStats()
+        stats.total_size_bytes = manifest.total_size()
 
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if os.path.exists(file_path):
-                    ext = Path(file).suffix.lower()
-                    file_size = os.path.getsize(file_path)
-                    stats.total_size_bytes += file_size
-
-                    if ext in image_extensions:
-                        stats.image_count += 1
-                    elif ext in video_extensions:
-                        stats.video_count += 1
+        for ext in manifest.exts:
+            if ext in IMAGE_EXTENSIONS:
+                stats.image_count += 1
+            elif ext in VIDEO_EXTENSIONS:
+                stats.video_count += 1
 
         return stats
 
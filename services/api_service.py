@@ -4,12 +4,87 @@
 API服务 - 处理与服务器API的交互
 """
 
+import asyncio
+import hashlib
+import http.client
+import json
+import mimetypes
 import os
+import random
 import re
+import threading
 import time
-from typing import List, Dict, Any, Optional
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from itertools import islice
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+# 流式 multipart 上传支持
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    HAS_TOOLBELT = True
+except ImportError:
+    HAS_TOOLBELT = False
+
+# HTTP/2 上传支持
+try:
+    import httpx
+    import h2  # noqa: F401  httpx 的 HTTP/2 依赖
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+# 快速 JSON 解析
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 大量文件排序加速
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# 异步上传支持
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# 上传缓存文件，与 config.json 放在同一目录
+UPLOAD_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "upload_cache.json"
+)
+_UPLOAD_CACHE_LOCK = threading.Lock()
+# 上传缓存最多保留的条目数，超出时丢弃最久未使用的条目
+UPLOAD_CACHE_MAX_ENTRIES = 50000
+
+# 自然排序用的数字分段正则
+_NUM_RE = re.compile(r'([0-9]+)')
+
+# 从标题提取分类名用的正则：统计信息、开头方括号中的名字、方括号内容
+_STATS_RE = re.compile(r'\s*\[\d+P(\+\d+V)?\s*-\s*\d+MB\]\s*')
+_LEADING_BRACKET_RE = re.compile(r'^\[([^\]]+)\]')
+_BRACKET_RE = re.compile(r'\[[^\]]*\]')
+
+# 超过该数量时使用 numpy 排序
+_NUMPY_SORT_THRESHOLD = 10_000
+# 数字段补零宽度，超过该长度的数字段无法用定长字符串比较
+_NUM_PAD_WIDTH = 32
+
+# 分类ID缓存有效期（秒），批量处理时同名分类和默认分类不必每篇文章都重新请求
+CATEGORY_CACHE_TTL = 900
 
 
 class APIService:
@@ -23,16 +98,27 @@ class APIService:
         self.config = config
         self.logger = logger
 
+        # 并发上传时保护会话重建和重新登录
+        self._session_lock = threading.Lock()
+
+        # 多个文件并行发布时，同名分类的搜索和创建串行执行，避免重复创建
+        self._category_lock = threading.Lock()
+
+        # 认证头，登录后设置一次，每个请求单独传入
+        self._auth: Optional[str] = f'Bearer {config.access_token}' if config.access_token else None
+
         # 创建会话
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Linux; U; Android 4.0.3; ko-kr; LG-L160L Build/IML74K) AppleWebkit/534.30',
-            'Device-Id': config.device_id,
-            'Connection': 'close'  # 禁用 keep-alive，避免连接复用问题
-        })
+        self.session = self._create_session()
+
+        # HTTP/2 上传客户端（按需创建）
+        self._http2_client = None
+        if config.enable_http2 and HAS_HTTP2:
+            threading.Thread(target=self._warmup_http2_client, daemon=True).start()
 
         # 缓存
         self._categories_cache = None
+        # 分类名 -> (分类ID, 写入时间)，键 None 表示默认分类
+        self._category_ids: Dict[Optional[str], Tuple[int, float]] = {}
 
     def ensure_login(self) -> bool:
         """确保已登录"""
@@ -42,61 +128,52 @@ class APIService:
 
     def is_token_valid(self) -> bool:
         """检查token是否有效"""
-        if not self.config.access_token:
-            return False
-
-        if 'Authorization' not in self.session.headers:
-            self.session.headers['Authorization'] = f'Bearer {self.config.access_token}'
-
-        return True
+        return bool(self._auth)
 
     def login(self) -> bool:
         """登录获取token"""
         self._log("开始登录...")
 
-        for attempt in range(self.config.max_retries):
-            try:
-                # 打印请求信息
-                self._log(f"========== 登录请求 ==========")
-                self._log(f"请求URL: {self.config.login_api}")
-                self._log(f"请求Headers: {dict(self.session.headers)}")
-                self._log(f"请求Body: account={self.config.login_account}, deviceId={self.config.device_id}")
-
-                response = self.session.post(
-                    self.config.login_api,
-                    json={
-                        'account': self.config.login_account,
-                        'password': self.config.login_password,
-                        'deviceId': self.config.device_id
-                    },
-                    timeout=self.config.api_timeout
-                )
+        # 网络错误和5xx由会话适配器重试，账号密码错误重试没有意义
+        try:
+            # 打印请求信息
+            self._log(f"========== 登录请求 ==========")
+            self._log(f"请求URL: {self.config.login_api}")
+            self._log(f"请求Headers: {dict(self.session.headers)}")
+            self._log(f"请求Body: account={self.config.login_account}, deviceId={self.config.device_id}")
 
-                # 打印响应信息
-                self._log(f"========== 登录响应 ==========")
-                self._log(f"响应状态码: HTTP {response.status_code}")
-                self._log(f"响应内容: {response.text[:500] if len(response.text) > 500 else response.text}")
+            response = self.session.post(
+                self.config.login_api,
+                json={
+                    'account': self.config.login_account,
+                    'password': self.config.login_password,
+                    'deviceId': self.config.device_id
+                },
+                timeout=self.config.api_timeout
+            )
 
-                if response.status_code in [200, 201]:
-                    data = response.json()
-                    if data.get('code') in [0, 200, 201]:
-                        token = data.get('data', {}).get('token')
-                        if token:
-                            self.config.access_token = token
-                            self.session.headers['Authorization'] = f'Bearer {token}'
-                            self._log(f"登录成功, token: {token[:20]}...")
-                            return True
-                    self._log(f"登录失败: code={data.get('code')}, message={data.get('message')}", level="warning")
-                else:
-                    self._log(f"登录失败: HTTP {response.status_code}", level="warning")
+            # 打印响应信息
+            self._log(f"========== 登录响应 ==========")
+            self._log(f"响应状态码: HTTP {response.status_code}")
+            self._log(f"响应内容: {response.text[:500] if len(response.text) > 500 else response.text}")
 
-            except Exception as e:
-                self._log(f"登录请求失败: {e}", level="warning")
+            if response.status_code in [200, 201]:
+                data = self._decode_json(response)
+                if data.get('code') in [0, 200, 201]:
+                    token = data.get('data', {}).get('token')
+                    if token:
+                        self.config.access_token = token
+                        self._auth = f'Bearer {token}'
+                        self._log(f"登录成功, token: {token[:20]}...")
+                        return True
+                self._log(f"登录失败: code={data.get('code')}, message={data.get('message')}", level="warning")
+            else:
+                self._log(f"登录失败: HTTP {response.status_code}", level="warning")
 
-            if attempt < self.config.max_retries - 1:
-                time.sleep((attempt + 1) * 5)
+        except Exception as e:
+            self._log(f"登录请求失败: {e}", level="warning")
 
-        self._log("登录失败，已达到最大重试次数", level="error")
+        self._log("登录失败", level="error")
         return False
 
     def upload_files(self, directory: str) -> List[str]:
@@ -117,129 +194,642 @@ class APIService:
             return []
 
         # 只收集 webp 文件（压缩后的文件）
-        all_images = []
-
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext == '.webp':
-                    all_images.append(os.path.join(root, file))
+        all_images = self._collect_webp_files(directory)
 
         if not all_images:
             self._log(f"没有找到 webp 文件，目录内容: {os.listdir(directory)[:10]}", level="error")
             return []
 
         # 自然排序
-        all_images.sort(key=self._natural_sort_key)
+        all_images = self._natural_sorted(all_images)
         self._log(f"找到 {len(all_images)} 张 webp 图片待上传")
 
-        # 分批上传
-        all_urls = []
-        batch_size = self.config.upload_batch_size
-
-        for i in range(0, len(all_images), batch_size):
-            batch = all_images[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
+        # 内容去重：相同内容的图片直接使用之前上传得到的URL
+        digests: Dict[str, Optional[str]] = {}
+        cache: Dict[str, str] = {}
+        if self.config.upload_dedup:
+            digests = self._hash_files(all_images)
+            cache = self._load_upload_cache()
+
+        pending_images = [p for p in all_images if digests.get(p) not in cache]
+        if len(pending_images) < len(all_images):
+            self._log(f"{len(all_images) - len(pending_images)} 张图片已上传过，使用已有URL")
+
+        # 成功批次的条目先收集在内存中，本次上传结束（包括中途失败）时一次性写入缓存：
+        # 已上传的URL不会丢失，重新处理同一来源时按内容命中缓存，相当于从中断处继续
+        new_entries: Dict[str, str] = {}
+
+        def on_batch_done(batch: List[str], urls: List[str]):
+            # 只有返回URL数与文件数一致时才能确定对应关系
+            if digests and len(urls) == len(batch):
+                new_entries.update(
+                    (digests[path], url) for path, url in zip(batch, urls) if digests.get(path)
+                )
 
-            self._log(f"上传第 {batch_num} 批 ({len(batch)} 张)")
+        try:
+            batch_results = self._upload_batches(pending_images, on_batch_done) if pending_images else []
+        finally:
+            if new_entries:
+                # 命中的旧条目一并写回，刷新其使用顺序
+                hits = {digests[p]: cache[digests[p]] for p in all_images if digests.get(p) in cache}
+                self._merge_upload_cache({**hits, **new_entries})
+        if batch_results is None:
+            return []
 
-            urls = self._upload_batch(batch)
-            if urls:
-                all_urls.extend(urls)
+        # URL数与文件数不一致的批次无法逐个对应，整批URL放在该批次第一张图片的位置，
+        # 保持与图片相同的批次顺序
+        uploaded: Dict[str, str] = {}
+        unmatched: Dict[str, List[str]] = {}
+        for batch, urls in batch_results:
+            if len(urls) == len(batch):
+                uploaded.update(zip(batch, urls))
             else:
-                self._log(f"第 {batch_num} 批上传失败", level="error")
-                return []
+                unmatched[batch[0]] = urls
+
+        all_urls = []
+        for path in all_images:
+            url = cache.get(digests.get(path)) or uploaded.get(path)
+            if url:
+                all_urls.append(url)
+            elif path in unmatched:
+                all_urls.extend(unmatched[path])
 
         self._log(f"上传完成，共 {len(all_urls)} 个URL")
         return all_urls
 
+    def _upload_batches(self, images: List[str],
+                        on_batch_done: Callable[[List[str], List[str]], None] = None) -> Optional[List[tuple]]:
+        """
+        分批上传图片
+
+        Args:
+            images: 已排序的图片路径列表
+            on_batch_done: 每个批次成功后的回调 (批次文件列表, URL列表)
+
+        Returns:
+            按批次顺序排列的 (批次文件列表, URL列表)，任一批次失败返回None
+        """
+        batch_size = self.config.upload_batch_size
+        batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+        total_batches = len(batches)
+
+        if self.config.upload_async and HAS_AIOHTTP:
+            results = asyncio.run(self._upload_batches_async(batches, on_batch_done))
+            if results is None:
+                return None
+            return list(zip(batches, results))
+
+        workers = max(1, min(self.config.upload_concurrency, total_batches))
+
+        # 按批次序号收集结果，保证URL顺序与图片顺序一致
+        results: List[Optional[List[str]]] = [None] * total_batches
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._upload_one_batch, batch, index + 1, total_batches): index
+                for index, batch in enumerate(batches)
+            }
+            for future in as_completed(futures):
+                urls = future.result()
+                if not urls:
+                    # 任一批次失败则取消尚未开始的批次
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+                results[futures[future]] = urls
+                if on_batch_done:
+                    on_batch_done(batches[futures[future]], urls)
+
+        return list(zip(batches, results))
+
+    def _hash_files(self, files: List[str]) -> Dict[str, Optional[str]]:
+        """并行计算文件的 SHA-256（hashlib 计算时会释放GIL）"""
+        workers = max(1, min(4, os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(files, executor.map(self._sha256_file, files)))
+
+    @staticmethod
+    def _sha256_file(path: str) -> Optional[str]:
+        """计算文件的 SHA-256，读取失败返回None"""
+        try:
+            with open(path, 'rb') as f:
+                if hasattr(hashlib, 'file_digest'):
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+                h = hashlib.sha256()
+                while chunk := f.read(1 << 20):
+                    h.update(chunk)
+                return h.hexdigest()
+        except OSError:
+            return None
+
+    def _load_upload_cache(self) -> Dict[str, str]:
+        """加载上传缓存 {sha256: url}"""
+        if not os.path.exists(UPLOAD_CACHE_FILE):
+            return {}
+        try:
+            with open(UPLOAD_CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as e:
+            self._log(f"读取上传缓存失败: {e}", level="warning")
+            return {}
+
+    def _merge_upload_cache(self, entries: Dict[str, str]):
+        """
+        把新条目合并进上传缓存
+
+        多个文件并行处理时会同时写缓存，加锁后合并磁盘上的最新内容再保存；
+        新写入的条目移到末尾，超出 UPLOAD_CACHE_MAX_ENTRIES 时从最旧的条目开始丢弃
+        """
+        if not entries:
+            return
+        with _UPLOAD_CACHE_LOCK:
+            cache = self._load_upload_cache()
+            for digest, url in entries.items():
+                cache.pop(digest, None)
+                cache[digest] = url
+            overflow = len(cache) - UPLOAD_CACHE_MAX_ENTRIES
+            if overflow > 0:
+                cache = dict(islice(cache.items(), overflow, None))
+            self._save_upload_cache(cache)
+
+    def _save_upload_cache(self, cache: Dict[str, str]):
+        """保存上传缓存（先写临时文件再替换，避免中断时损坏缓存）"""
+        tmp_file = UPLOAD_CACHE_FILE + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp_file, UPLOAD_CACHE_FILE)
+        except OSError as e:
+            self._log(f"保存上传缓存失败: {e}", level="warning")
+
+    @staticmethod
+    def _collect_webp_files(directory: str) -> List[str]:
+        """
+        递归收集目录下的 webp 文件
+
+        使用 os.scandir 显式栈遍历，DirEntry 自带文件类型信息，不需要额外的 stat 调用
+
+        Args:
+            directory: 目录路径
+
+        Returns:
+            webp 文件路径列表（未排序）
+        """
+        result = []
+        stack = [directory]
+
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name[-5:].lower() == '.webp':
+                            result.append(entry.path)
+            except OSError:
+                # 与 os.walk 一致，忽略无法访问的子目录
+                continue
+
+        return result
+
+    def _upload_one_batch(self, batch: List[str], batch_num: int,
+                          total_batches: int) -> Optional[List[str]]:
+        """上传单个批次（在线程池中执行）"""
+        self._log(f"上传第 {batch_num}/{total_batches} 批 ({len(batch)} 张)")
+
+        urls = self._upload_batch(batch)
+        if not urls:
+            self._log(f"第 {batch_num} 批上传失败", level="error")
+        return urls
+
     def _upload_batch(self, files: List[str]) -> Optional[List[str]]:
         """上传一批文件"""
-        for attempt in range(self.config.max_retries):
+        # 与重试无关的值只取一次
+        max_retries = self.config.max_retries
+        upload_api = self.config.upload_api
+        log = self._log
+        file_meta = [(f, os.path.basename(f), self._guess_mime_type(f)) for f in files]
+
+        for attempt in range(max_retries):
+            stale_auth = self._auth
             try:
-                files_data = [('file', open(f, 'rb')) for f in files]
+                # ExitStack 保证异常时所有文件句柄都会被关闭
+                with ExitStack() as stack:
+                    fields = [
+                        ('file', (name, self._open_for_upload(stack, path), mime_type))
+                        for path, name, mime_type in file_meta
+                    ]
 
-                try:
                     # 打印请求信息
-                    self._log(f"========== 上传请求 ==========")
-                    self._log(f"请求URL: {self.config.upload_api}")
-                    self._log(f"请求Headers: {dict(self.session.headers)}")
-                    self._log(f"上传文件数: {len(files)}")
+                    log(f"========== 上传请求 ==========")
+                    log(f"请求URL: {upload_api}")
+                    log(f"请求Headers: {dict(self.session.headers, **self._auth_headers())}")
+                    log(f"上传文件数: {len(files)}")
 
-                    response = self.session.post(
-                        self.config.upload_api,
-                        files=files_data,
-                        timeout=self.config.api_timeout
-                    )
+                    response = self._post_multipart(fields)
 
                     # 打印响应信息
-                    self._log(f"========== 上传响应 ==========")
-                    self._log(f"响应状态码: HTTP {response.status_code}")
-                    self._log(f"响应Headers: {dict(response.headers)}")
-                    self._log(f"响应内容: {response.text[:1000] if len(response.text) > 1000 else response.text}")
+                    log(f"========== 上传响应 ==========")
+                    log(f"响应状态码: HTTP {response.status_code}")
+                    log(f"响应Headers: {dict(response.headers)}")
+                    # response.text 每次访问都会重新解码，只取一次
+                    text = response.text
+                    log(f"响应内容: {text[:1000]}")
 
                     if response.status_code in [200, 201]:
-                        data = response.json()
-                        self._log(f"解析后数据: code={data.get('code')}, message={data.get('message')}")
-                        self._log(f"data字段内容: {data.get('data')}")
-
-                        if data.get('code') in [0, 200, 201]:
-                            response_data = data.get('data', [])
-                            if isinstance(response_data, list):
-                                urls = [item.get('url') for item in response_data if isinstance(item, dict)]
-                                valid_urls = [u for u in urls if u]
-                                self._log(f"获取到 {len(valid_urls)} 个URL: {valid_urls[:3]}...")
-                                return valid_urls
-                            else:
-                                self._log(f"响应data不是列表: {response_data}", level="warning")
-                        else:
-                            self._log(f"API返回错误: code={data.get('code')}, message={data.get('message', data)}", level="warning")
+                        data = self._decode_json(response)
+                        log(f"解析后数据: code={data.get('code')}, message={data.get('message')}")
+                        log(f"data字段内容: {data.get('data')}")
+
+                        valid_urls = self._extract_upload_urls(data)
+                        if valid_urls is not None:
+                            return valid_urls
 
                     # 认证错误
                     if response.status_code in [401, 403]:
-                        self._log("认证失败，尝试重新登录", level="warning")
-                        if self.login():
+                        log("认证失败，尝试重新登录", level="warning")
+                        if self._relogin(stale_auth):
                             continue
                         return None
 
                     # 其他错误
-                    self._log(f"上传失败: {response.text[:500]}", level="warning")
-
-                finally:
-                    for _, f in files_data:
-                        f.close()
+                    log(f"上传失败: {text[:500]}", level="warning")
 
             except (ConnectionResetError, ConnectionError) as e:
-                self._log(f"连接被重置: {e}", level="warning")
+                log(f"连接被重置: {e}", level="warning")
                 # 连接错误时创建新session
                 self._reset_session()
 
+            except Exception as e:
+                log(f"上传异常: {e}", level="warning")
+
+            if attempt < max_retries - 1:
+                wait_time = self._backoff_delay(attempt)
+                log(f"等待重试 ({attempt + 2}/{max_retries})，{wait_time:.1f}秒后重试...")
+                time.sleep(wait_time)
+
+        return None
+
+    @staticmethod
+    def _decode_json(response) -> Any:
+        """解析响应JSON，安装了 orjson 时直接从原始字节解析"""
+        if HAS_ORJSON:
+            return orjson.loads(response.content)
+        return response.json()
+
+    def _extract_upload_urls(self, data: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        从上传接口的响应数据中提取URL
+
+        Args:
+            data: 解析后的响应JSON
+
+        Returns:
+            URL列表，响应表示失败时返回None
+        """
+        if data.get('code') in [0, 200, 201]:
+            response_data = data.get('data', [])
+            if isinstance(response_data, list):
+                urls = [item.get('url') for item in response_data if isinstance(item, dict)]
+                valid_urls = [u for u in urls if u]
+                self._log(f"获取到 {len(valid_urls)} 个URL: {valid_urls[:3]}...")
+                return valid_urls
+            self._log(f"响应data不是列表: {response_data}", level="warning")
+        else:
+            self._log(f"API返回错误: code={data.get('code')}, message={data.get('message', data)}", level="warning")
+        return None
+
+    async def _upload_batches_async(self, batches: List[List[str]],
+                                    on_batch_done: Callable[[List[str], List[str]], None] = None
+                                    ) -> Optional[List[List[str]]]:
+        """
+        使用 aiohttp 并发上传所有批次
+
+        所有批次共用一个 ClientSession，并发数由连接器的 limit 控制
+
+        Args:
+            batches: 分好批的文件列表
+
+        Returns:
+            按批次顺序排列的URL列表，任一批次失败返回None
+        """
+        total_batches = len(batches)
+        headers = dict(self.session.headers)
+        connector = aiohttp.TCPConnector(limit=max(1, self.config.upload_concurrency), ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.config.api_timeout)
+
+        async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+            tasks = [
+                asyncio.create_task(self._upload_batch_async(session, batch, index + 1, total_batches,
+                                                             on_batch_done))
+                for index, batch in enumerate(batches)
+            ]
+            try:
+                # gather 按提交顺序返回结果，URL顺序与图片顺序一致
+                results = await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        if not all(results):
+            return None
+        return results
+
+    async def _upload_batch_async(self, session: 'aiohttp.ClientSession', files: List[str],
+                                  batch_num: int, total_batches: int,
+                                  on_batch_done: Callable[[List[str], List[str]], None] = None
+                                  ) -> Optional[List[str]]:
+        """异步上传一批文件"""
+        self._log(f"上传第 {batch_num}/{total_batches} 批 ({len(files)} 张)")
+
+        for attempt in range(self.config.max_retries):
+            stale_auth = self._auth
+            headers = self._auth_headers()
+            try:
+                with ExitStack() as stack:
+                    form = aiohttp.FormData()
+                    for f in files:
+                        form.add_field('file', self._open_for_upload(stack, f),
+                                       filename=os.path.basename(f),
+                                       content_type=self._guess_mime_type(f))
+
+                    async with session.post(self.config.upload_api, data=form, headers=headers) as response:
+                        text = await response.text()
+                        self._log(f"第 {batch_num} 批响应: HTTP {response.status}")
+
+                        if response.status in [200, 201]:
+                            body = await response.read()
+                            data = orjson.loads(body) if HAS_ORJSON else json.loads(body)
+                            urls = self._extract_upload_urls(data)
+                            if urls is not None:
+                                if on_batch_done:
+                                    on_batch_done(files, urls)
+                                return urls
+
+                        # 认证错误，登录是同步请求，放到线程中执行避免阻塞事件循环
+                        if response.status in [401, 403]:
+                            self._log("认证失败，尝试重新登录", level="warning")
+                            if await asyncio.to_thread(self._relogin, stale_auth):
+                                continue
+                            self._log(f"第 {batch_num} 批上传失败", level="error")
+                            return None
+
+                        self._log(f"上传失败: {text[:500]}", level="warning")
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 self._log(f"上传异常: {e}", level="warning")
 
             if attempt < self.config.max_retries - 1:
-                wait_time = (attempt + 1) * 10  # 增加等待时间
-                self._log(f"等待重试 ({attempt + 2}/{self.config.max_retries})，{wait_time}秒后重试...")
-                time.sleep(wait_time)
+                wait_time = self._backoff_delay(attempt)
+                self._log(f"等待重试 ({attempt + 2}/{self.config.max_retries})，{wait_time:.1f}秒后重试...")
+                await asyncio.sleep(wait_time)
 
+        self._log(f"第 {batch_num} 批上传失败", level="error")
         return None
 
-    def _reset_session(self):
-        """重置会话"""
+    def _post_multipart(self, fields: list) -> requests.Response:
+        """
+        发送 multipart 上传请求
+
+        安装了 requests_toolbelt 时使用 MultipartEncoder 流式发送，
+        文件内容按块从磁盘读取，不会整体加载到内存
+
+        Args:
+            fields: [('file', (文件名, 文件对象, MIME类型)), ...]
+
+        Returns:
+            响应对象
+        """
+        if self.config.zero_copy_upload and hasattr(os, 'sendfile'):
+            return self._post_multipart_zero_copy(fields)
+
+        if self.config.enable_http2 and HAS_HTTP2:
+            client = self._get_http2_client()
+            return client.post(self.config.upload_api, files=fields, headers=self._auth_headers())
+
+        if HAS_TOOLBELT:
+            encoder = MultipartEncoder(fields=fields)
+            return self.session.post(
+                self.config.upload_api,
+                data=encoder,
+                headers={'Content-Type': encoder.content_type, **self._auth_headers()},
+                timeout=self.config.api_timeout
+            )
+
+        return self.session.post(
+            self.config.upload_api,
+            files=fields,
+            headers=self._auth_headers(),
+            timeout=self.config.api_timeout
+        )
+
+    def _post_multipart_zero_copy(self, fields: list) -> requests.Response:
+        """
+        使用 socket.sendfile 发送 multipart 上传请求
+
+        multipart 的分隔头由 Python 写入，文件内容通过 sendfile(2) 直接从页缓存发送到 socket，
+        不经过 Python 缓冲区。HTTPS 下只有启用了内核 TLS 才是真正零拷贝，否则 sendfile 会退化为分块 send
+
+        Args:
+            fields: [('file', (文件名, 文件对象, MIME类型)), ...]
+
+        Returns:
+            响应对象（构造为 requests.Response，与其他上传路径保持一致）
+        """
+        url = urlsplit(self.config.upload_api)
+        boundary = uuid.uuid4().hex
+        closing = f'--{boundary}--\r\n'.encode('ascii')
+
+        # 预先生成每个文件的分隔头并计算 Content-Length
+        parts = []
+        content_length = len(closing)
+        for name, (filename, fp, content_type) in fields:
+            safe_name = filename.replace('"', '%22')
+            preamble = (
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"; filename="{safe_name}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'
+            ).encode('utf-8')
+            size = os.fstat(fp.fileno()).st_size
+            parts.append((preamble, fp))
+            content_length += len(preamble) + size + 2
+
+        conn_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        conn = conn_class(url.netloc, timeout=self.config.api_timeout)
         try:
-            self.session.close()
-        except:
+            path = url.path or '/'
+            if url.query:
+                path += '?' + url.query
+            conn.putrequest('POST', path)
+            for key, value in dict(self.session.headers, **self._auth_headers()).items():
+                # 响应体不经过 requests 解码，只接受未压缩的响应（putrequest 已发送 identity）
+                if key.lower() != 'accept-encoding':
+                    conn.putheader(key, value)
+            conn.putheader('Content-Type', f'multipart/form-data; boundary={boundary}')
+            conn.putheader('Content-Length', str(content_length))
+            conn.endheaders()
+
+            sock = conn.sock
+            for preamble, fp in parts:
+                sock.sendall(preamble)
+                sock.sendfile(fp)
+                sock.sendall(b'\r\n')
+            sock.sendall(closing)
+
+            raw = conn.getresponse()
+            response = requests.Response()
+            response.status_code = raw.status
+            response.headers = CaseInsensitiveDict(raw.getheaders())
+            response.url = self.config.upload_api
+            response._content = raw.read()
+            return response
+        finally:
+            conn.close()
+
+    def _get_http2_client(self) -> 'httpx.Client':
+        """
+        获取 HTTP/2 上传客户端
+
+        所有批次复用同一条 TLS 连接多路复用上传，httpx.Client 本身是线程安全的
+        """
+        with self._session_lock:
+            if self._http2_client is None:
+                # HTTP/2 禁止 Connection 等逐跳头，不沿用 session 的 'Connection: close'
+                headers = {k: v for k, v in self.session.headers.items() if k != 'Connection'}
+                pool_size = max(10, self.config.upload_concurrency * 2)
+                self._http2_client = httpx.Client(
+                    http2=True,
+                    headers=headers,
+                    timeout=self.config.api_timeout,
+                    limits=httpx.Limits(max_connections=pool_size,
+                                        max_keepalive_connections=pool_size)
+                )
+            return self._http2_client
+
+    @staticmethod
+    def _open_for_upload(stack: ExitStack, path: str):
+        """
+        打开待上传文件并注册到 ExitStack
+
+        Linux 下通过 posix_fadvise 提示内核顺序预读，上传结束后释放页缓存，
+        避免大批量上传时挤掉系统中其他文件的缓存
+        """
+        fp = stack.enter_context(open(path, 'rb', buffering=1 << 20))
+
+        if hasattr(os, 'posix_fadvise'):
+            fd = fp.fileno()
+            try:
+                # fadvise 的 advice 参数不是位掩码，需要分开调用
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+            else:
+                # ExitStack 按后进先出执行，会在文件关闭前调用
+                stack.callback(APIService._drop_page_cache, fd)
+
+        return fp
+
+    @staticmethod
+    def _drop_page_cache(fd: int):
+        """释放文件的页缓存"""
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
             pass
 
-        self.session = requests.Session()
-        self.session.headers.update({
+    @staticmethod
+    def _guess_mime_type(file_path: str) -> str:
+        """获取文件的 MIME 类型"""
+        return mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+
+    @staticmethod
+    def _backoff_delay(attempt: int, base: float = 5.0, cap: float = 60.0) -> float:
+        """
+        计算带抖动的指数退避时间
+
+        并发批次同时失败时随机抖动可以错开重试，避免同时打到服务器
+        """
+        return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+    def _auth_headers(self) -> Dict[str, str]:
+        """当前请求使用的认证头"""
+        auth = self._auth
+        return {'Authorization': auth} if auth else {}
+
+    def _relogin(self, stale_auth: Optional[str]) -> bool:
+        """
+        认证失效时重新登录
+
+        并发上传时多个批次可能同时收到401，只有第一个线程真正登录，
+        其余线程发现token已被刷新后直接重试
+
+        Args:
+            stale_auth: 请求发出时使用的认证头
+
+        Returns:
+            是否已获得新的token
+        """
+        with self._session_lock:
+            if self._auth and self._auth != stale_auth:
+                return True
+            self._auth = None
+            return self.login()
+
+    def _create_session(self) -> requests.Session:
+        """创建会话"""
+        session = requests.Session()
+        session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Linux; U; Android 4.0.3; ko-kr; LG-L160L Build/IML74K) AppleWebkit/534.30',
             'Device-Id': self.config.device_id,
-            'Connection': 'close'  # 禁用 keep-alive
+            'Connection': 'close'  # 禁用 keep-alive，避免连接复用问题
         })
 
-        if self.config.access_token:
-            self.session.headers['Authorization'] = f'Bearer {self.config.access_token}'
+        # 连接池大小与并发上传数匹配，避免并发请求在默认连接池上排队
+        pool_size = max(10, self.config.upload_concurrency * 2)
+
+        # 瞬时错误由 urllib3 重试（指数退避）。POST 不是幂等的：服务端返回 5xx 时
+        # 分类、文章可能已经创建，重发会产生重复数据，因此只对 GET/HEAD 按状态码和
+        # 读取错误重试；连接失败时请求尚未发出，POST 仍会按 connect 重试
+        retry = Retry(
+            total=self.config.max_retries,
+            backoff_factor=0.5,
+            status_forcelist=[408, 429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        # 上传请求体是流式的，发送后无法回绕，由 _upload_batch 自己重试
+        if self.config.upload_api:
+            session.mount(self.config.upload_api, HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+            ))
+
+        return session
+
+    def _reset_session(self):
+        """重置会话"""
+        with self._session_lock:
+            try:
+                self.session.close()
+            except:
+                pass
+
+            self.session = self._create_session()
+
+            if self._http2_client is not None:
+                try:
+                    self._http2_client.close()
+                except Exception:
+                    pass
+                self._http2_client = None
 
     def submit_article(self, title: str, images: List[str],
                        cover: str, publish: bool = True,
@@ -288,6 +878,7 @@ class APIService:
                 response = self.session.post(
                     self.config.article_api,
                     json=article_data,
+                    headers=self._auth_headers(),
                     timeout=self.config.api_timeout
                 )
 
@@ -295,7 +886,7 @@ class APIService:
                 self._log(f"[APIService] 响应内容: {response.text[:500]}")
 
                 if response.status_code in [200, 201]:
-                    data = response.json()
+                    data = self._decode_json(response)
                     if data.get('code') in [0, 200, 201] or data.get('data', {}).get('success'):
                         self._log("文章提交成功")
                         return True
@@ -310,17 +901,18 @@ class APIService:
                 # 认证错误
                 if response.status_code in [401, 403]:
                     self._log("[APIService] 认证失败，尝试重新登录")
-                    if self.login():
+                    if self._relogin(self._auth):
                         continue
                     return False
 
+                # 其他错误的瞬时重试已由会话适配器完成
+                break
+
             except Exception as e:
                 self._log(f"提交文章失败: {e}", level="warning")
                 import traceback
                 self._log(f"异常堆栈: {traceback.format_exc()}", level="warning")
-
-            if attempt < self.config.max_retries - 1:
-                time.sleep((attempt + 1) * 5)
+                break
 
         self._log("提交文章失败", level="error")
         return False
@@ -334,10 +926,21 @@ class APIService:
         if not category_name:
             return self._get_default_category_id()
 
+        with self._category_lock:
+            return self._find_or_create_named_category(category_name, first_image_url)
+
+    def _find_or_create_named_category(self, category_name: str, first_image_url: str = None) -> int:
+        """按分类名查找或创建分类（调用方持有 _category_lock）"""
+        category_id = self._cached_category_id(category_name)
+        if category_id:
+            self._log(f"[APIService] 使用缓存的分类: {category_name} -> {category_id}")
+            return category_id
+
         # 搜索分类
         category_id = self._search_category(category_name)
         if category_id:
             self._log(f"[APIService] 找到分类: {category_name} -> {category_id}")
+            self._remember_category_id(category_name, category_id)
             return category_id
 
         # 创建分类
@@ -345,27 +948,46 @@ class APIService:
         new_id = self._create_category(category_name, first_image_url)
         if new_id:
             self._log(f"[APIService] 创建分类成功: {category_name} -> {new_id}")
+            self._remember_category_id(category_name, new_id)
             return new_id
 
         # 创建失败，使用默认分类
         self._log(f"[APIService] 创建分类失败，使用默认分类", level="warning")
         return self._get_default_category_id()
 
+    def _cached_category_id(self, name: Optional[str]) -> Optional[int]:
+        """读取未过期的分类ID缓存"""
+        entry = self._category_ids.get(name)
+        if entry and time.monotonic() - entry[1] < CATEGORY_CACHE_TTL:
+            return entry[0]
+        return None
+
+    def _remember_category_id(self, name: Optional[str], category_id: int):
+        """缓存查到或新建的分类ID（只缓存成功结果，未找到的分类下次仍会搜索）"""
+        self._category_ids[name] = (category_id, time.monotonic())
+
     def _get_default_category_id(self) -> int:
         """获取默认分类ID（分类列表中的第一个）"""
+        cached = self._cached_category_id(None)
+        if cached:
+            return cached
+
         try:
             response = self.session.get(
                 self.config.category_api,
                 params={'page': 0, 'size': 1},
+                headers=self._auth_headers(),
                 timeout=self.config.api_timeout
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = self._decode_json(response)
                 categories = data.get('data', {}).get('data', [])
                 if categories:
                     first_id = categories[0].get('id')
                     self._log(f"[APIService] 使用默认分类: {first_id}")
+                    if first_id:
+                        self._remember_category_id(None, first_id)
                     return first_id
         except Exception as e:
             self._log(f"[APIService] 获取默认分类失败: {e}", level="warning")
@@ -375,10 +997,10 @@ class APIService:
     def _extract_category_name(self, title: str) -> str:
         """从标题提取分类名"""
         # 移除统计信息
-        name = re.sub(r'\s*\[\d+P(\+\d+V)?\s*-\s*\d+MB\]\s*', ' ', title)
+        name = _STATS_RE.sub(' ', title)
 
         # 提取方括号中的名字
-        match = re.match(r'^\[([^\]]+)\]', name)
+        match = _LEADING_BRACKET_RE.match(name)
         if match:
             return match.group(1).strip()
 
@@ -387,7 +1009,7 @@ class APIService:
             return name.split('_')[0].strip()
 
         # 移除方括号
-        name = re.sub(r'\[[^\]]*\]', '', name)
+        name = _BRACKET_RE.sub('', name)
         return name.strip()
 
     def _search_category(self, name: str) -> Optional[int]:
@@ -397,12 +1019,13 @@ class APIService:
             response = self.session.get(
                 self.config.category_api,
                 params={'name': name},
+                headers=self._auth_headers(),
                 timeout=self.config.api_timeout
             )
 
             self._log(f"[APIService] 搜索分类响应: {response.status_code}")
             if response.status_code == 200:
-                data = response.json()
+                data = self._decode_json(response)
                 categories = data.get('data', {}).get('data', [])
                 self._log(f"[APIService] 搜索结果数量: {len(categories)}")
                 if categories:
@@ -429,12 +1052,13 @@ class APIService:
                     'sort': 0,
                     'status': 'ENABLED'
                 },
+                headers=self._auth_headers(),
                 timeout=self.config.api_timeout
             )
 
             self._log(f"[APIService] 创建分类响应: {response.status_code}, {response.text[:200]}")
             if response.status_code in [200, 201]:
-                data = response.json()
+                data = self._decode_json(response)
                 if data.get('code') in [0, 200, 201]:
                     return data.get('data', {}).get('data', {}).get('id')
 
@@ -448,11 +1072,12 @@ class APIService:
         try:
             response = self.session.get(
                 self.config.category_api,
+                headers=self._auth_headers(),
                 timeout=self.config.api_timeout
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = self._decode_json(response)
                 if data.get('code') in [0, 200]:
                     self._categories_cache = data.get('data', {})
                     return self._categories_cache
@@ -463,22 +1088,88 @@ class APIService:
         return None
 
     def test_connection(self) -> bool:
-        """测试连接"""
+        """测试连接（对服务器根地址发 HEAD 请求，不经过登录接口）"""
         try:
-            response = self.session.get(self.config.login_api, timeout=10)
-            return response.status_code in [200, 404, 201]
+            response = self.session.head(self._api_origin(), timeout=5, allow_redirects=False)
+            return response.status_code < 500
         except Exception:
             return False
 
-    def _natural_sort_key(self, text: str):
+    def _api_origin(self) -> str:
+        """API服务器根地址"""
+        url = urlsplit(self.config.upload_api or self.config.login_api)
+        return f"{url.scheme}://{url.netloc}/"
+
+    def _warmup_http2_client(self):
+        """
+        预热 HTTP/2 上传连接
+
+        requests 会话使用 'Connection: close' 不保留连接，预热只对 HTTP/2 客户端有意义：
+        提前完成 DNS 解析和 TLS 握手，第一批上传可以直接复用连接
+        """
+        try:
+            self._get_http2_client().head(self._api_origin(), timeout=5)
+        except Exception as e:
+            self._log(f"预热上传连接失败: {e}", level="warning")
+
+    @staticmethod
+    def _natural_sorted(paths: List[str]) -> List[str]:
+        """
+        按自然顺序排序路径
+
+        先去掉所有路径的公共前缀再生成排序键，单目录上传时键里只剩文件名部分；
+        键只计算一次，按下标排序后再取回路径
+        """
+        if len(paths) < 2:
+            return list(paths)
+
+        offset = len(os.path.commonpath(paths))
+
+        if HAS_NUMPY and len(paths) > _NUMPY_SORT_THRESHOLD:
+            padded = APIService._padded_sort_keys(paths, offset)
+            if padded is not None:
+                order = np.argsort(np.array(padded), kind='stable')
+                return [paths[i] for i in order]
+
+        keys = [APIService._natural_sort_key(p[offset:].lstrip(os.sep)) for p in paths]
+        order = sorted(range(len(paths)), key=keys.__getitem__)
+        return [paths[i] for i in order]
+
+    @staticmethod
+    def _padded_sort_keys(paths: List[str], offset: int) -> Optional[List[str]]:
+        """
+        生成可直接按字符串比较的自然排序键
+
+        数字段加前缀并补零到固定宽度后，字符串顺序与 _natural_sort_key 的元组顺序一致，
+        可以交给 numpy 在C层排序。目录与文件名之间用 \\x01 分隔，保证目录仍按原样比较
+
+        Returns:
+            排序键列表，存在超长数字段时返回None
+        """
+        too_long = False
+
+        def pad(match):
+            nonlocal too_long
+            digits = match.group()
+            if len(digits) > _NUM_PAD_WIDTH:
+                too_long = True
+            # \x02 前缀保证数字段排在任何可见字符之前，与元组键中字符串段更短时的顺序一致
+            return '\x02' + digits.zfill(_NUM_PAD_WIDTH)
+
+        keys = []
+        for p in paths:
+            dirname, filename = os.path.split(p[offset:].lstrip(os.sep))
+            keys.append(dirname + '\x01' + _NUM_RE.sub(pad, filename))
+
+        return None if too_long else keys
+
+    @staticmethod
+    def _natural_sort_key(text: str) -> tuple:
         """自然排序键"""
         dirname, filename = os.path.split(text)
-        def tryint(s):
-            try:
-                return int(s)
-            except:
-                return s
-        return [dirname] + [tryint(c) for c in re.split('([0-9]+)', filename)]
+        parts = _NUM_RE.split(filename)
+        # split 带捕获组时奇数位置一定是数字段
+        return (dirname,) + tuple(int(p) if i & 1 else p for i, p in enumerate(parts))
 
     def _log(self, message: str, level: str = "info"):
         """记录日志"""
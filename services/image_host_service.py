@@ -142,30 +142,14 @@ class ImageHostService:
             self._log(f"[ImageHost] 目录不存在: {directory}", level="error")
             return []
 
-        # 收集图片文件
-        all_images = []
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in extensions:
-                    all_images.append(os.path.join(root, file))
+        # 收集图片文件（按目录、文件名自然排序）
+        from infrastructure.utils import collect_sorted_files
+        all_images = collect_sorted_files(directory, extensions)
 
         if not all_images:
             self._log(f"[ImageHost] 没有找到图片文件", level="warning")
             return []
 
-        # 自然排序
-        import re
-        def natural_sort_key(text: str):
-            dirname, filename = os.path.split(text)
-            def tryint(s):
-                try:
-                    return int(s)
-                except:
-                    return s
-            return [dirname] + [tryint(c) for c in re.split('([0-9]+)', filename)]
-
-        all_images.sort(key=natural_sort_key)
         self._log(f"[ImageHost] 找到 {len(all_images)} 张图片待上传")
 
         # 上传文件
@@ -4,18 +4,74 @@
 主控制器 - 负责协调视图和业务逻辑
 """
 
+import copy
 import os
+import queue
+import stat
 import threading
-from typing import List, Optional, TYPE_CHECKING
+import time
+import _tkinter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
 
 from infrastructure.config import Config
 from infrastructure.logger import Logger
+from infrastructure.utils import (
+    ARCHIVE_EXTENSIONS, get_folder_size_cached, natural_sort_key
+)
 from core.events import Events
 
 if TYPE_CHECKING:
     from .main_view import MainView
 
 
+# 日志和状态批量刷新到界面的间隔（毫秒）
+UI_FLUSH_INTERVAL_MS = 50
+
+# 单次刷新最多处理的消息数，积压过多时分多次刷新，避免一次占用主线程太久
+UI_FLUSH_MAX_ITEMS = 2000
+
+# 进度条更新节流：变化不足 1% 且距上次不足 0.25 秒时不更新
+PROGRESS_MIN_STEP = 1.0
+PROGRESS_MIN_INTERVAL = 0.25
+
+
+@dataclass
+class FileEntry:
+    """文件列表条目"""
+    size: Optional[int] = None  # 文件大小；文件夹在后台统计完成前为 None
+    is_dir: bool = False
+
+
+class _PublishOrder:
+    """
+    按队列顺序发布
+
+    并行处理时第 n 个文件发布前等待前面的文件都已结束（发布完成、失败或跳过）。
+    线程池按提交顺序启动任务，正在等待的文件前面的文件都已开始执行，不会互相等待
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._next = 1
+        self._finished: Set[int] = set()
+
+    def wait(self, index: int):
+        """阻塞到序号 index 之前的文件都已结束"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._next >= index)
+
+    def finish(self, index: int):
+        """标记序号 index 的文件已结束"""
+        with self._cond:
+            self._finished.add(index)
+            while self._next in self._finished:
+                self._finished.discard(self._next)
+                self._next += 1
+            self._cond.notify_all()
+
+
 class MainController:
     """
     主控制器
@@ -29,29 +85,161 @@ class MainController:
         self.view = view
 
         # 状态
-        self.files: List[str] = []
+        # 待处理文件：绝对路径 -> 条目（字典保持添加顺序，去重和移除都是 O(1)）
+        self.files: Dict[str, FileEntry] = {}
         self.is_processing = False
         self.should_stop = False
 
         # 处理器
         self._file_processor = None
 
-    def add_files(self, files: List[str]):
-        """添加文件到列表"""
-        for file in files:
-            if file not in self.files:
-                self.files.append(file)
+        # 待刷新到界面的日志和状态
+        self._ui_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._flush_lock = threading.Lock()
+        self._flush_pending = False
+
+        # 最近一次发布的进度及时间
+        self._last_progress = -1.0
+        self._last_progress_time = 0.0
+
+        # 处理期间保存的 Tk 空闲轮询间隔
+        self._saved_busy_wait: Optional[int] = None
+
+        # 文件处理线程池（首次处理时创建，跨批次复用）
+        self._process_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool_size = 0
+
+        # 配置写盘线程（单线程，保证多次保存按顺序写入）
+        self._config_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='config')
+        # 等待写盘的最新配置快照；连续多次保存只写最后一次
+        self._pending_config: Optional[Config] = None
+        self._config_lock = threading.Lock()
+        # 最近一次写入（或启动时加载）的配置，用于判断是否有改动
+        self._saved_config: Config = copy.deepcopy(config)
+
+    def add_files(self, files: List[str], rejected: Optional[List[str]] = None):
+        """
+        添加文件到列表（只接受文件夹和压缩文件，不支持的文件汇总后提示一次）
+
+        Args:
+            files: 待添加的路径
+            rejected: 调用方已筛掉的路径，一并计入提示
+        """
+        rejected = list(rejected or [])
+        count_before = len(self.files)
+        folders = []
+
+        # 大批量拖入时循环是热点，属性和全局查找先绑定到局部变量
+        entries = self.files
+        reject = rejected.append
+        abspath = os.path.abspath
+        os_stat = os.stat
+        s_isdir = stat.S_ISDIR
+        s_isreg = stat.S_ISREG
+        splitext = os.path.splitext
+        archive_exts = ARCHIVE_EXTENSIONS
+
+        # 先按绝对路径整体去重并剔除已在列表中的路径，同一批里重复的路径
+        # （包括不支持的文件）只 stat 一次；同一文件经不同相对路径添加也不会重复
+        new_paths = [p for p in dict.fromkeys(abspath(f) for f in files) if p not in entries]
+
+        for file in new_paths:
+            # 一次 stat 同时确认存在性、类型和大小；压缩文件只看扩展名
+            try:
+                st = os_stat(file)
+            except OSError:
+                reject(file)
+                continue
+            mode = st.st_mode
+            if s_isdir(mode):
+                archives = self._expand_archive_folder(file)
+                if not archives:
+                    entries[file] = FileEntry(is_dir=True)
+                    folders.append(file)
+                    continue
+                for path, size in archives:
+                    if path not in entries:
+                        entries[path] = FileEntry(size=size)
+            elif s_isreg(mode) and splitext(file)[1].lower() in archive_exts:
+                entries[file] = FileEntry(size=st.st_size)
+            else:
+                reject(file)
 
+        added = len(entries) - count_before
+        if folders:
+            threading.Thread(target=self._measure_folders, args=(folders,), daemon=True).start()
         self._update_file_list()
-        self.logger.info(f"添加了 {len(files)} 个文件")
+        self.logger.info(f"添加了 {added} 个文件")
+
+        if rejected:
+            names = ", ".join(os.path.basename(f) for f in rejected[:10])
+            if len(rejected) > 10:
+                names += " ..."
+            self._log(f"跳过 {len(rejected)} 个不支持的文件: {names}")
+            self.view.update_status(f"跳过 {len(rejected)} 个不支持的文件")
+
+    def _measure_folders(self, folders: List[str]):
+        """后台统计文件夹大小（工作线程），完成后刷新列表"""
+        sizes = {folder: get_folder_size_cached(folder) for folder in folders}
+
+        def apply():
+            for folder, size in sizes.items():
+                entry = self.files.get(folder)
+                if entry is not None:
+                    entry.size = size
+            self.view.set_folder_sizes(sizes)
+            self._update_file_list()
+        self._run_on_main_thread(apply)
+
+    def _expand_archive_folder(self, folder: str) -> List[tuple]:
+        """
+        展开只包含压缩文件的文件夹
+
+        在主线程执行，用 scandir 显式栈遍历，遇到第一个非压缩文件立即返回空列表
+        （图片文件夹通常第一层就能判断），只对压缩文件 stat 取大小。
+        文件夹中只要有其它文件就视为待处理的图片文件夹，大小由后台线程统计。
+
+        Returns:
+            [(压缩文件路径, 大小)]，按自然顺序排序
+        """
+        pairs = []
+        stack = [folder]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            if os.path.splitext(entry.name)[1].lower() not in ARCHIVE_EXTENSIONS:
+                                return []
+                            pairs.append((entry.path, entry.stat(follow_symlinks=False).st_size))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        pairs.sort(key=lambda p: natural_sort_key(p[0]))
+        return pairs
 
     def remove_files(self, indices: tuple):
         """移除文件"""
-        # 从后往前删除，避免索引变化
-        for i in sorted(indices, reverse=True):
-            if 0 <= i < len(self.files):
-                self.files.pop(i)
+        # 列表框的索引与 files 的顺序一一对应
+        paths = list(self.files)
+        for i in indices:
+            if 0 <= i < len(paths):
+                self.files.pop(paths[i], None)
+
+        self._update_file_list()
 
+    def remove_processed_files(self, processed: Set[str]):
+        """按路径移除已处理的文件（一次遍历，不按显示名逐项查找）"""
+        if not processed:
+            return
+        for path in processed:
+            self.files.pop(path, None)
         self._update_file_list()
 
     def clear_files(self):
@@ -74,6 +262,10 @@ class MainController:
         self.should_stop = False
         self.view.set_processing(True)
         self.view.clear_log()
+        self.view.update_progress(0)
+        self._last_progress = 0.0
+        self._last_progress_time = time.monotonic()
+        self._set_busy_wait(True)
 
         # 在后台线程中处理
         thread = threading.Thread(target=self._process_files, daemon=True)
@@ -82,6 +274,8 @@ class MainController:
     def stop_processing(self):
         """停止处理"""
         self.should_stop = True
+        if self._file_processor:
+            self._file_processor.cancel()
         self.logger.info("正在停止处理...")
 
     def open_settings(self):
@@ -94,11 +288,31 @@ class MainController:
 
     def _on_settings_saved(self, config: Config):
         """设置保存回调"""
-        from infrastructure.config import ConfigManager
         self.config = config
-        # 保存配置到文件
-        ConfigManager().save_config_with_config(config)
-        self.logger.info("设置已保存")
+        if config == self._saved_config:
+            self.logger.info("配置未变，跳过保存")
+            return
+        self._saved_config = copy.deepcopy(config)
+
+        # 保存配置到文件：在后台写盘，点击保存后界面不等待磁盘 IO
+        with self._config_lock:
+            write_scheduled = self._pending_config is not None
+            self._pending_config = self._saved_config
+        if not write_scheduled:
+            self._config_pool.submit(self._save_config_worker)
+
+    def _save_config_worker(self):
+        """写入最新的配置快照（后台线程），失败时在状态栏提示"""
+        from infrastructure.config import ConfigManager
+        with self._config_lock:
+            config, self._pending_config = self._pending_config, None
+        if config is None:
+            return
+        if ConfigManager().save_config_with_config(config):
+            self.logger.info("设置已保存")
+        else:
+            self.logger.error("保存配置失败")
+            self._update_status("保存配置失败")
 
     def open_output_dir(self):
         """打开输出目录"""
@@ -134,8 +348,16 @@ class MainController:
         from pipeline_factory import FileProcessorFacade
 
         try:
-            # 创建处理器
-            processor = FileProcessorFacade(self.config, self.logger)
+            # 快照文件列表，处理期间主线程对列表的修改不影响本轮
+            files = tuple(self.files)
+            total = len(files)
+            processed = set()
+
+            # 创建处理器（多个文件并行时按文件数分摊压缩进程）
+            processor = FileProcessorFacade(self._processing_config(total), self.logger)
+            self._file_processor = processor
+            if self.should_stop:
+                processor.cancel()
 
             # 添加事件监听
             processor.add_event_listener(Events.STATUS_UPDATE, self._on_status_update)
@@ -143,51 +365,210 @@ class MainController:
             processor.add_event_listener(Events.PROCESSOR_COMPLETE, self._on_processor_complete)
             processor.add_event_listener(Events.PROCESSOR_ERROR, self._on_processor_error)
 
-            total = len(self.files)
-
-            for i, file_path in enumerate(self.files, 1):
+            # 各文件相互独立，可以并行处理，发布仍按队列顺序
+            pool = self._get_process_pool()
+            order = _PublishOrder()
+            futures = {
+                pool.submit(self._process_one, processor, file_path, i, total, order): file_path
+                for i, file_path in enumerate(files, 1)
+            }
+
+            for done, future in enumerate(as_completed(futures), 1):
+                file_path = futures[future]
+                self._update_progress(done, total)
                 if self.should_stop:
-                    self._update_status(f"处理已停止")
-                    break
-
-                self._update_status(f"处理中 ({i}/{total}): {os.path.basename(file_path)}")
+                    # 尚未开始的文件不再处理
+                    for pending in futures:
+                        pending.cancel()
+                if future.cancelled():
+                    continue
 
                 try:
-                    result = processor.process(
-                        file_path,
-                        status_callback=self._update_status
-                    )
-
-                    if result.get('errors'):
-                        self._log(f"处理完成但有错误: {result['errors']}")
-                    else:
-                        self._log(f"处理成功: {os.path.basename(file_path)}")
-
+                    result = future.result()
                 except Exception as e:
                     self._log(f"处理失败: {e}")
+                    continue
+
+                if result is None:
+                    continue
+                if result.get('errors'):
+                    self._log(f"处理完成但有错误: {result['errors']}")
+                else:
+                    self._log(f"处理成功: {os.path.basename(file_path)}")
+                    processed.add(file_path)
 
-            self._update_status("处理完成")
+            self._update_status("处理已停止" if self.should_stop else "处理完成")
+            self._run_on_main_thread(self.remove_processed_files, processed)
 
         except Exception as e:
             self.logger.exception(f"处理过程出错: {e}")
             self._log(f"处理过程出错: {e}")
 
         finally:
+            self._file_processor = None
             self.is_processing = False
-            self._run_on_main_thread(lambda: self.view.set_processing(False))
+            self._run_on_main_thread(self._on_processing_finished)
+
+    def _process_one(self, processor, file_path: str, index: int, total: int,
+                     order: _PublishOrder) -> Optional[dict]:
+        """处理单个文件（工作线程），已停止时返回 None"""
+        try:
+            if self.should_stop:
+                return None
+            # 一次 stat 确认文件仍存在，结果交给处理上下文复用
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
+                self._log(f"文件已不存在，跳过: {os.path.basename(file_path)}")
+                return None
+            self._update_status(f"处理中 ({index}/{total}): {os.path.basename(file_path)}")
+            return processor.process(file_path, status_callback=self._update_status, source_stat=st,
+                                     publish_turn=lambda: order.wait(index))
+        finally:
+            order.finish(index)
+
+    def _parallel_workers(self) -> int:
+        """同时处理的文件数（默认 1；设为 0 时自动，为界面线程预留核心，最多 4 个）"""
+        workers = self.config.parallel_files
+        if workers <= 0:
+            workers = min(4, max(2, (os.cpu_count() or 1) - 2))
+        return workers
+
+    def _processing_config(self, total: int) -> Config:
+        """
+        本轮处理使用的配置
+
+        每个文件的图片压缩各自启动 compress_workers 个 FFmpeg 进程，并行处理多个文件时
+        按文件数分摊，总进程数不超过单文件处理时的数量
+        """
+        parallel = min(self._parallel_workers(), total)
+        if parallel <= 1:
+            return self.config
+        config = copy.copy(self.config)
+        config.compress_workers = max(1, (config.compress_workers or os.cpu_count() or 1) // parallel)
+        return config
+
+    def _get_process_pool(self) -> ThreadPoolExecutor:
+        """
+        获取文件处理线程池
+
+        线程池跨批次复用，线程按需创建；设置中的并行数变化后重建
+        """
+        workers = self._parallel_workers()
+        if self._process_pool is None or self._process_pool_size != workers:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False)
+            self._process_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='process')
+            self._process_pool_size = workers
+        return self._process_pool
+
+    def _on_processing_finished(self):
+        """处理结束（主线程）"""
+        self.view.set_processing(False)
+        self._set_busy_wait(False)
+
+    def _set_busy_wait(self, busy: bool):
+        """
+        调整 Tk 主循环的空闲轮询间隔
+
+        非线程版 Tcl 下 mainloop 在没有事件时会 Sleep(busywaitinterval)（默认 20ms），
+        工作线程通过 after 投递的回调最多要等这么久才执行。处理期间缩短到 1ms，结束后恢复
+        """
+        if not hasattr(_tkinter, 'setbusywaitinterval'):
+            return
+        if busy:
+            if self._saved_busy_wait is None:
+                self._saved_busy_wait = _tkinter.getbusywaitinterval()
+            _tkinter.setbusywaitinterval(1)
+        elif self._saved_busy_wait is not None:
+            _tkinter.setbusywaitinterval(self._saved_busy_wait)
+            self._saved_busy_wait = None
 
     def _update_file_list(self):
-        """更新文件列表视图"""
-        self._run_on_main_thread(lambda: self.view.update_file_list(self.files))
+        """更新文件列表视图（添加时已取得的文件大小一并传给视图，不再重复 stat）"""
+        files = list(self.files)
+        known_sizes = {path: entry.size for path, entry in self.files.items()
+                       if not entry.is_dir and entry.size is not None}
+        self._run_on_main_thread(self.view.update_file_list, files, known_sizes)
 
     def _update_status(self, message: str):
         """更新状态"""
-        self._run_on_main_thread(lambda: self.view.update_status(message))
+        self._enqueue_ui('status', message)
+
+    def _update_progress(self, done: int, total: int):
+        """更新进度（节流，最后一个文件总是发布）"""
+        percent = done * 100.0 / total if total else 100.0
+        now = time.monotonic()
+        if (done < total
+                and percent - self._last_progress < PROGRESS_MIN_STEP
+                and now - self._last_progress_time < PROGRESS_MIN_INTERVAL):
+            return
+        self._last_progress = percent
+        self._last_progress_time = now
+        self._enqueue_ui('progress', percent)
 
     def _log(self, message: str):
         """记录日志"""
         self.logger.info(message)
-        self._run_on_main_thread(lambda: self.view.append_log(message))
+        self._enqueue_ui('log', message)
+
+    def _enqueue_ui(self, kind: str, message):
+        """
+        缓冲状态和日志更新
+
+        工作线程产生的消息先放入队列，主线程每 UI_FLUSH_INTERVAL_MS 毫秒批量刷新一次，
+        避免大量细小的 after 回调逐条改动文本控件
+        """
+        self._ui_queue.put((kind, message))
+        with self._flush_lock:
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+        self.view.parent.after(UI_FLUSH_INTERVAL_MS, self._flush_ui)
+
+    def _flush_ui(self):
+        """在主线程中批量应用缓冲的日志、状态和进度（状态和进度只保留最后一条）"""
+        with self._flush_lock:
+            # 窗口最小化时不刷新：消息留在队列中，保持 pending 以免继续投递回调，
+            # 窗口恢复时由 on_window_shown 一次性刷新
+            if not self.view.is_visible:
+                self._flush_pending = True
+                return
+            self._flush_pending = False
+
+        logs = []
+        status = None
+        progress = None
+        for _ in range(UI_FLUSH_MAX_ITEMS):
+            try:
+                kind, message = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                logs.append(message)
+            elif kind == 'progress':
+                progress = message
+            else:
+                status = message
+
+        if logs:
+            self.view.append_logs(logs)
+        if status is not None:
+            self.view.update_status(status)
+        if progress is not None:
+            self.view.update_progress(progress)
+
+        # 还有积压时继续安排下一次刷新
+        if not self._ui_queue.empty():
+            with self._flush_lock:
+                if self._flush_pending:
+                    return
+                self._flush_pending = True
+            self.view.parent.after(UI_FLUSH_INTERVAL_MS, self._flush_ui)
+
+    def on_window_shown(self):
+        """窗口恢复显示，刷新最小化期间积压的日志和状态"""
+        self._flush_ui()
 
     def _on_status_update(self, message: str):
         """状态更新事件"""
@@ -206,7 +587,11 @@ class MainController:
         """处理器错误事件"""
         self._log(f"[{name}] 错误: {error}")
 
-    def _run_on_main_thread(self, callback):
-        """在主线程中执行回调"""
-        # 使用after确保在主线程执行
-        self.view.parent.after(0, callback)
\ No newline at end of file
+    def _run_on_main_thread(self, callback, *args):
+        """在主线程中执行回调（参数在调度时绑定，不依赖闭包捕获）"""
+        # 使用 after_idle 在主线程执行（空闲队列，不占用定时器堆）；
+        # 先刷新缓冲的日志和状态，保持消息顺序
+        def run():
+            self._flush_ui()
+            callback(*args)
+        self.view.parent.after_idle(run)
\ No newline at end of file
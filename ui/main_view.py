@@ -6,6 +6,7 @@
 
 import os
 import re
+import stat
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from typing import TYPE_CHECKING, Callable, Optional, List
@@ -17,10 +18,26 @@ try:
 except ImportError:
     HAS_DND = False
 
+from infrastructure.utils import ARCHIVE_EXTENSIONS, ARCHIVE_FILE_PATTERN, format_file_size
+
 if TYPE_CHECKING:
     from .main_controller import MainController
     from infrastructure.config import Config
 
+# 日志区保留的行数；超出 MAX_LOG_LINES + LOG_TRIM_SLACK 行时一次删回 MAX_LOG_LINES 行，
+# 不必每次刷新都做删除
+MAX_LOG_LINES = 2000
+LOG_TRIM_SLACK = 500
+
+# 滚动位置不低于该比例时视为停在末尾，新日志自动跟随（留出浮点误差）
+LOG_FOLLOW_THRESHOLD = 0.999
+
+# 文件列表每次插入的最大条目数，超出部分分批在后续事件循环中插入
+LIST_INSERT_CHUNK = 500
+
+# 拖拽数据中的路径：{带空格的路径} 或不含空白的路径
+_DROP_PATH_RE = re.compile(r'\{([^}]+)\}|(\S+)')
+
 
 class MainView:
     """
@@ -29,11 +46,26 @@ class MainView:
     负责UI渲染和用户交互，不包含业务逻辑
     """
 
+    # 添加文件对话框的文件类型过滤，与压缩文件扩展名集合保持一致
+    _FILE_TYPES = (
+        ("压缩文件", ARCHIVE_FILE_PATTERN),
+        ("所有文件", "*.*"),
+    )
+
     def __init__(self, parent: tk.Tk, config: 'Config'):
         self.parent = parent
         self.config = config
         self.controller: Optional['MainController'] = None
 
+        # 文件列表显示缓存：路径 -> (显示文本, 大小)
+        self._display_cache = {}
+
+        # 文件列表刷新代数，新的刷新开始后丢弃尚未插入完的旧批次
+        self._list_generation = 0
+
+        # 窗口是否可见（最小化时为 False）
+        self.is_visible = True
+
         # 创建主框架
         self.main_frame = ttk.Frame(parent)
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -44,6 +76,10 @@ class MainView:
         # 设置拖拽
         self._setup_drag_drop()
 
+        # 跟踪窗口最小化/恢复
+        self.parent.bind('<Map>', self._on_map, add='+')
+        self.parent.bind('<Unmap>', self._on_unmap, add='+')
+
     def set_controller(self, controller: 'MainController'):
         """设置控制器"""
         self.controller = controller
@@ -79,10 +115,17 @@ class MainView:
         btn_frame = ttk.Frame(list_frame)
         btn_frame.pack(fill=tk.X, pady=(5, 0))
 
-        ttk.Button(btn_frame, text="添加文件", command=self._on_add_files).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="添加文件夹", command=self._on_add_folder).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="清空列表", command=self._on_clear_files).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="移除选中", command=self._on_remove_selected).pack(side=tk.LEFT, padx=5)
+        # 处理期间禁用这些按钮
+        self._file_buttons = []
+        for text, command in (
+            ("添加文件", self._on_add_files),
+            ("添加文件夹", self._on_add_folder),
+            ("清空列表", self._on_clear_files),
+            ("移除选中", self._on_remove_selected),
+        ):
+            button = ttk.Button(btn_frame, text=text, command=command)
+            button.pack(side=tk.LEFT, padx=5)
+            self._file_buttons.append(button)
 
         # 提示标签
         hint_text = "拖拽文件或文件夹到此处添加" if HAS_DND else "点击按钮添加文件"
@@ -90,7 +133,8 @@ class MainView:
         self.hint_label.pack(pady=5)
 
         # 文件计数标签
-        self.file_count_label = ttk.Label(list_frame, text="共 0 个文件", foreground='blue')
+        self._file_count_text = "共 0 个文件"
+        self.file_count_label = ttk.Label(list_frame, text=self._file_count_text, foreground='blue')
         self.file_count_label.pack(pady=2)
 
     def _create_action_buttons(self):
@@ -121,8 +165,14 @@ class MainView:
         status_frame = ttk.Frame(self.main_frame)
         status_frame.pack(fill=tk.X)
 
-        self.status_label = ttk.Label(status_frame, text="就绪", relief=tk.SUNKEN, anchor=tk.W)
-        self.status_label.pack(fill=tk.X)
+        self.progress_var = tk.DoubleVar(value=0.0)
+        self.progress_bar = ttk.Progressbar(status_frame, variable=self.progress_var,
+                                            maximum=100, length=150)
+        self.progress_bar.pack(side=tk.RIGHT, padx=(5, 0))
+
+        self._status_text = "就绪"
+        self.status_label = ttk.Label(status_frame, text=self._status_text, relief=tk.SUNKEN, anchor=tk.W)
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
     def _setup_drag_drop(self):
         """设置拖拽功能"""
@@ -145,10 +195,7 @@ class MainView:
         """添加文件事件"""
         files = filedialog.askopenfilenames(
             title="选择文件",
-            filetypes=[
-                ("压缩文件", "*.7z *.zip *.rar *.tar *.gz"),
-                ("所有文件", "*.*")
-            ]
+            filetypes=self._FILE_TYPES
         )
         if files and self.controller:
             self.controller.add_files(list(files))
@@ -175,7 +222,15 @@ class MainView:
         if self.controller:
             # 解析拖拽的文件
             files = self._parse_dropped_files(event.data)
-            self.controller.add_files(files)
+
+            # 先按扩展名预筛选：压缩文件直接通过，只有其余路径才需要 stat 判断是否为文件夹
+            accepted, rejected = [], []
+            for path in files:
+                if os.path.splitext(path)[1].lower() in ARCHIVE_EXTENSIONS or os.path.isdir(path):
+                    accepted.append(path)
+                else:
+                    rejected.append(path)
+            self.controller.add_files(accepted, rejected=rejected)
 
     def _parse_dropped_files(self, data: str) -> List[str]:
         """解析拖拽的文件"""
@@ -190,19 +245,33 @@ class MainView:
 
         # 处理花括号包裹的路径
         # 匹配 {path} 或普通路径
-        pattern = r'\{([^}]+)\}|(\S+)'
-        matches = re.findall(pattern, data)
+        matches = _DROP_PATH_RE.findall(data)
 
         for match in matches:
             # match 是一个元组，取非空的那个
             path = match[0] if match[0] else match[1]
             path = path.strip()
 
-            if path and os.path.exists(path):
+            # 存在性和类型由控制器统一用一次 stat 检查
+            if path:
                 files.append(path)
 
         return files
 
+    def _on_map(self, event):
+        """窗口恢复显示事件"""
+        # 顶层窗口的绑定也会收到子控件的事件，只处理窗口本身
+        if event.widget is not self.parent:
+            return
+        self.is_visible = True
+        if self.controller:
+            self.controller.on_window_shown()
+
+    def _on_unmap(self, event):
+        """窗口最小化事件"""
+        if event.widget is self.parent:
+            self.is_visible = False
+
     def _on_start_processing(self):
         """开始处理事件"""
         if self.controller:
@@ -225,47 +294,110 @@ class MainView:
 
     # ============ 视图更新方法 ============
 
-    def update_file_list(self, files: List[str]):
-        """更新文件列表"""
-        self.file_listbox.delete(0, tk.END)
+    def update_file_list(self, files: List[str], known_sizes: Optional[dict] = None):
+        """
+        更新文件列表
+
+        Args:
+            files: 文件路径列表
+            known_sizes: 已知的文件大小（路径 -> 字节），命中的文件不再 stat
+        """
         total_size = 0
+        displays = []
+        cache = {}
 
         for file in files:
-            # 显示文件名和大小
+            # 已显示过的条目直接复用，只对新加入的文件 stat
+            cached = self._display_cache.get(file)
+            if cached is not None:
+                display, size = cached
+                total_size += size
+                displays.append(display)
+                cache[file] = cached
+                continue
+
+            if known_sizes and file in known_sizes:
+                size = known_sizes[file]
+                total_size += size
+                display = f"{os.path.basename(file)} ({self._format_size(size)})"
+                displays.append(display)
+                cache[file] = (display, size)
+                continue
+
+            # 显示文件名和大小（每项只 stat 一次）
+            size = 0
             try:
-                if os.path.isfile(file):
-                    size = os.path.getsize(file)
+                st = os.stat(file)
+                if stat.S_ISREG(st.st_mode):
+                    size = st.st_size
                     total_size += size
-                    size_str = self._format_size(size)
+                    size_str = self._format_size(st.st_size)
                     display = f"{os.path.basename(file)} ({size_str})"
-                elif os.path.isdir(file):
+                elif stat.S_ISDIR(st.st_mode):
                     display = f"[文件夹] {os.path.basename(file)}"
                 else:
                     display = os.path.basename(file)
-            except:
+            except OSError:
                 display = os.path.basename(file)
 
-            self.file_listbox.insert(tk.END, display)
+            displays.append(display)
+            cache[file] = (display, size)
+
+        self._display_cache = cache
+
+        # 整批替换条目；条目很多时分批插入，批次之间事件循环可以处理重绘和输入
+        self._list_generation += 1
+        self.file_listbox.delete(0, tk.END)
+        self._insert_list_chunk(displays, 0, self._list_generation)
 
         # 更新文件计数
         count_text = f"共 {len(files)} 个项目"
         if total_size > 0:
             count_text += f" | 总大小: {self._format_size(total_size)}"
-        self.file_count_label.config(text=count_text)
+        if count_text != self._file_count_text:
+            self._file_count_text = count_text
+            self.file_count_label.config(text=count_text)
+
+    def _insert_list_chunk(self, displays: List[str], start: int, generation: int):
+        """插入一批列表条目，剩余部分通过 after 继续"""
+        if generation != self._list_generation:
+            return
+        chunk = displays[start:start + LIST_INSERT_CHUNK]
+        if chunk:
+            self.file_listbox.insert(tk.END, *chunk)
+        next_start = start + LIST_INSERT_CHUNK
+        if next_start < len(displays):
+            self.parent.after(0, self._insert_list_chunk, displays, next_start, generation)
+
+    def set_folder_sizes(self, sizes: dict):
+        """记录后台统计出的文件夹大小，下次 update_file_list 时显示"""
+        for path, size in sizes.items():
+            self._display_cache[path] = (
+                f"[文件夹] {os.path.basename(path)} ({self._format_size(size)})", size
+            )
 
     def _format_size(self, size: int) -> str:
-        """格式化文件大小"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
+        """格式化文件大小（与 utils.format_file_size 一致，单位表为模块级常量，不再每次新建列表）"""
+        return format_file_size(size)
 
     def append_log(self, message: str):
         """追加日志"""
+        self.append_logs([message])
+
+    def append_logs(self, messages: List[str]):
+        """批量追加日志（一次插入、一次滚动）"""
+        # 只有视图本来停在末尾时才自动滚动；用户向上翻看时不做 see 的布局计算
+        at_bottom = self.log_text.yview()[1] >= LOG_FOLLOW_THRESHOLD
         self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
+        self.log_text.insert(tk.END, "".join(f"{m}\n" for m in messages))
+
+        # 限制日志长度，长时间处理时保持内存和文本引擎开销有界
+        line_count = int(self.log_text.index('end-1c').split('.')[0])
+        if line_count > MAX_LOG_LINES + LOG_TRIM_SLACK:
+            self.log_text.delete('1.0', f'{line_count - MAX_LOG_LINES + 1}.0')
+
+        if at_bottom:
+            self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
 
     def clear_log(self):
@@ -275,15 +407,23 @@ class MainView:
         self.log_text.config(state=tk.DISABLED)
 
     def update_status(self, message: str):
-        """更新状态栏"""
+        """更新状态栏（文本未变化时不调用 configure）"""
+        if message == self._status_text:
+            return
+        self._status_text = message
         self.status_label.config(text=message)
 
+    def update_progress(self, percent: float):
+        """更新进度条（0-100）"""
+        self.progress_var.set(percent)
+
     def set_processing(self, is_processing: bool):
         """设置处理状态"""
-        if is_processing:
-            self.status_label.config(text="处理中...")
-        else:
-            self.status_label.config(text="就绪")
+        state = tk.DISABLED if is_processing else tk.NORMAL
+        for button in self._file_buttons:
+            button.config(state=state)
+
+        self.update_status("处理中..." if is_processing else "就绪")
 
     def show_message(self, title: str, message: str, msg_type: str = "info"):
         """显示消息框"""
@@ -4,6 +4,7 @@
 设置视图 - 配置管理界面
 """
 
+import dataclasses
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from typing import TYPE_CHECKING, Callable, Optional, Dict, Any
@@ -24,11 +25,12 @@ class SettingsView:
         self.config = config
 
         # 创建设置窗口
+        # 构建期间先隐藏窗口，控件全部创建后再显示，避免逐个控件重新布局和重绘
         self.window = tk.Toplevel(parent)
+        self.window.withdraw()
         self.window.title("设置")
         self.window.geometry("700x700")
         self.window.transient(parent)
-        self.window.grab_set()
 
         # 回调
         self.on_save: Optional[Callable[['Config'], None]] = None
@@ -39,6 +41,9 @@ class SettingsView:
         # 创建UI
         self._create_widgets()
 
+        self.window.deiconify()
+        self.window.grab_set()
+
     def _create_widgets(self):
         """创建UI组件"""
         # 底部按钮（先pack，固定在底部）
@@ -50,9 +55,9 @@ class SettingsView:
         main_frame = ttk.Frame(self.window, padding=10)
         main_frame.pack(fill=tk.BOTH, expand=True)
 
-        # 创建Notebook（分页）
+        # 创建Notebook（分页），各设置页创建完成后再放入布局，
+        # 未映射的控件添加子控件时不会触发几何传播
         self.notebook = ttk.Notebook(main_frame)
-        self.notebook.pack(fill=tk.BOTH, expand=True)
 
         # 创建各个设置页
         self._create_basic_tab()
@@ -63,6 +68,8 @@ class SettingsView:
         self._create_image_host_tab()
         self._create_processing_tab()
 
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
     # ============ 基本设置 ============
 
     def _create_basic_tab(self):
@@ -110,13 +117,14 @@ class SettingsView:
 
         self._add_entry_field(basic_frame, "zip_password", "压缩密码:", 0, show="*")
         self._add_combobox_field(basic_frame, "zip_format", "压缩格式:", 1,
-                                  ["7z", "zip", "zst"])
+                                  ["7z", "zip", "zst", "tar.zst"])
         self._add_spinbox_field(basic_frame, "zip_compression_level", "压缩级别:", 2,
                                  0, 9, 1)
         self._add_entry_field(basic_frame, "zip_dictionary_size", "字典大小:", 3)
 
         # 固实模式
         self._add_checkbox_field(basic_frame, "zip_solid_mode", "启用固实压缩", 4)
+        self._add_checkbox_field(basic_frame, "background_archiving", "后台打包（与压缩、上传并行）", 5)
 
         # ZSTD设置
         zstd_frame = ttk.LabelFrame(frame, text="ZSTD高级设置", padding=10)
@@ -153,6 +161,9 @@ class SettingsView:
                                   ["webp", "avif", "jpg", "png"])
         self._add_checkbox_field(quality_frame, "lossless_compression", "无损压缩", 3)
         self._add_spinbox_field(quality_frame, "max_upload_size_mb", "最大上传大小(MB):", 4, 1, 50, 1)
+        self._add_spinbox_field(quality_frame, "compress_workers", "并发压缩进程数 (0=自动):", 5, 0, 64, 1)
+        self._add_spinbox_field(quality_frame, "webp_compression_level", "WebP压缩等级 (0-6):", 6, 0, 6, 1)
+        self._add_spinbox_field(quality_frame, "encoder_threads", "单进程编码线程数 (0=自动):", 7, 0, 64, 1)
 
         # 上传方式设置
         upload_method_frame = ttk.LabelFrame(frame, text="上传方式", padding=10)
@@ -191,9 +202,14 @@ class SettingsView:
         other_frame.pack(fill=tk.X, pady=5)
 
         self._add_spinbox_field(other_frame, "upload_batch_size", "上传批次大小:", 0, 1, 100, 1)
-        self._add_spinbox_field(other_frame, "api_timeout", "API超时(秒):", 1, 10, 300, 10)
-        self._add_spinbox_field(other_frame, "extraction_timeout", "解压超时(秒):", 2, 30, 600, 30)
-        self._add_spinbox_field(other_frame, "max_retries", "最大重试次数:", 3, 1, 10, 1)
+        self._add_spinbox_field(other_frame, "upload_concurrency", "并发上传批次:", 1, 1, 16, 1)
+        self._add_spinbox_field(other_frame, "api_timeout", "API超时(秒):", 2, 10, 300, 10)
+        self._add_spinbox_field(other_frame, "extraction_timeout", "解压超时(秒):", 3, 30, 600, 30)
+        self._add_spinbox_field(other_frame, "max_retries", "最大重试次数:", 4, 1, 10, 1)
+        self._add_checkbox_field(other_frame, "upload_async", "异步上传 (需要 aiohttp)", 5)
+        self._add_checkbox_field(other_frame, "enable_http2", "HTTP/2 上传 (需要 httpx[http2])", 6)
+        self._add_checkbox_field(other_frame, "zero_copy_upload", "零拷贝上传 (sendfile, 非Windows)", 7)
+        self._add_checkbox_field(other_frame, "upload_dedup", "跳过已上传过的图片 (按内容哈希)", 8)
 
         # Token显示
         token_frame = ttk.LabelFrame(frame, text="Token", padding=10)
@@ -300,6 +316,12 @@ Imgur说明：
         self._add_checkbox_field(clean_frame, "delete_source_files", "删除源文件", 0)
         self._add_checkbox_field(clean_frame, "delete_compressed_images", "删除压缩后图片", 1)
 
+        # 并行处理设置
+        parallel_frame = ttk.LabelFrame(frame, text="并行处理", padding=10)
+        parallel_frame.pack(fill=tk.X, pady=5)
+
+        self._add_spinbox_field(parallel_frame, "parallel_files", "同时处理文件数 (0=自动):", 0, 0, 8, 1)
+
         # 网络设置
         network_frame = ttk.LabelFrame(frame, text="网络设置", padding=10)
         network_frame.pack(fill=tk.X, pady=5)
@@ -458,6 +480,9 @@ Imgur说明：
 
     def _on_save_click(self):
         """保存按钮点击"""
+        # 字段类型表只构建一次，避免每个变量都遍历一遍 dataclass 字段
+        field_types = {f.name: f.type for f in dataclasses.fields(self.config)}
+
         # 更新配置
         for key, var in self.vars.items():
             if key == 'passwords_text':
@@ -466,27 +491,16 @@ Imgur说明：
             value = var.get()
 
             # 类型转换
-            attr = getattr(self.config.__class__, key, None)
-            if attr is not None:
-                import dataclasses
-                if dataclasses.is_dataclass(self.config.__class__):
-                    field_type = None
-                    for f in dataclasses.fields(self.config.__class__):
-                        if f.name == key:
-                            field_type = f.type
-                            break
-
-                    if field_type == int:
-                        value = int(float(value))
-                    elif field_type == float:
-                        value = float(value)
-                    elif field_type == bool:
-                        if isinstance(value, bool):
-                            value = value
-                        elif isinstance(value, str):
-                            value = value.lower() == 'true'
-                        else:
-                            value = bool(value)
+            field_type = field_types.get(key)
+            if field_type == int:
+                value = int(float(value))
+            elif field_type == float:
+                value = float(value)
+            elif field_type == bool:
+                if isinstance(value, str):
+                    value = value.lower() == 'true'
+                else:
+                    value = bool(value)
 
             setattr(self.config, key, value)
 
@@ -509,11 +523,9 @@ Imgur说明：
             from infrastructure.config import Config
             default = Config()
 
-            for key in self.vars:
-                if key == 'passwords_text':
-                    continue
-                if hasattr(default, key):
-                    self.vars[key].set(getattr(default, key))
+            for key, var in self.vars.items():
+                if key != 'passwords_text' and hasattr(default, key):
+                    var.set(getattr(default, key))
 
             # 更新密码列表
             if 'passwords_text' in self.vars: